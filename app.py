@@ -14,7 +14,7 @@ from comparables_scheduler import start_scheduler
 # Import page modules
 from page_modules.dashboard_page import render_dashboard
 from page_modules.projects_page import render_projects_page
-from page_modules.reports_page import render_reports_page
+from page_modules.reports_page import render_reports_page, load_report_bundle
 from page_modules.comparables_page import render_comparables_page
 from page_modules.financials_page import render_financials_page
 from page_modules.profile_page import render_profile_page
@@ -599,19 +599,21 @@ elif current_page == 'ai_agent':
                         commodity=None
                     )
                 
-                    saved_analysis = ProjectManager.save_analysis(
-                        project_id=project['id'],
-                        analysis_data=analysis,
-                        scoring_data=scoring,
-                        recommendations=recommendations,
-                        scoring_template_id=template_id,
-                        narrative_data=narrative,
-                        sustainability_data=sustainability_analysis if not sustainability_analysis.get('error') else None,
-                        sustainability_scoring=sustainability_scoring,
-                        analysis_type='light_ai'
+                    saved_analysis = ProjectManager.save_project_submission(
+                        project['id'],
+                        extracted_docs,
+                        dict(
+                            analysis_data=analysis,
+                            scoring_data=scoring,
+                            recommendations=recommendations,
+                            scoring_template_id=template_id,
+                            narrative_data=narrative,
+                            sustainability_data=sustainability_analysis if not sustainability_analysis.get('error') else None,
+                            sustainability_scoring=sustainability_scoring,
+                            analysis_type='light_ai'
+                        )
                     )
-                
-                    ProjectManager.save_documents(project['id'], extracted_docs)
+                    load_report_bundle.clear()
                     
                     with st.spinner("🔍 Finding comparable projects for benchmarking..."):
                         from comparables_matcher import ComparablesMatchingService
@@ -5,8 +5,37 @@ from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from sqlalchemy.exc import OperationalError
 from contextlib import contextmanager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# JSON columns (e.g. Analysis.ai_analysis_raw) are encoded client-side on every insert;
+# orjson does this in C. psycopg2 binds JSON as text, so the bytes are decoded back to str.
+if ORJSON_AVAILABLE:
+    def _orjson_default(obj):
+        # numpy scalars the numpy option does not cover (e.g. np.float128); stdlib json accepts np.float64 as a float
+        if hasattr(obj, 'item'):
+            value = obj.item()
+            # np.longdouble.item() returns itself
+            return value if type(value) is not type(obj) else float(value)
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+    JSON_CODEC = {
+        # Monte Carlo stats in ai_analysis_raw are numpy scalars, which orjson rejects by default
+        'json_serializer': lambda obj: orjson.dumps(
+            obj,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode(),
+        'json_deserializer': orjson.loads,
+    }
+else:
+    JSON_CODEC = {}
+
 engine = create_engine(
     DATABASE_URL,
     pool_size=2,
@@ -20,7 +49,8 @@ engine = create_engine(
         'keepalives_interval': 10,
         'keepalives_count': 5,
     },
-    echo=False
+    echo=False,
+    **JSON_CODEC
 )
 
 SessionLocal = scoped_session(
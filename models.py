@@ -682,3 +682,18 @@ class TrainingStats(Base):
     settings = Column(JSON)
     
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EmbeddingCache(Base):
+    """Embeddings keyed by model and text hash so identical text is only sent to the API once"""
+    __tablename__ = 'embedding_cache'
+    __table_args__ = (
+        UniqueConstraint('model', 'text_hash', name='uq_embedding_cache_model_hash'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    model = Column(String, nullable=False)
+    text_hash = Column(String(64), nullable=False)
+    embedding = Column(JSON, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
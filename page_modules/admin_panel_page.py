@@ -2,6 +2,7 @@ import streamlit as st
 import bcrypt
 from database import get_db_session
 from models import User, Project, Analysis
+from project_manager import ProjectManager
 from datetime import datetime
 from sqlalchemy import func
 
@@ -119,6 +120,7 @@ def render_admin_panel_page(current_user):
                                 if user_to_delete:
                                     db.delete(user_to_delete)
                                     db.commit()
+                                    ProjectManager.clear_analysis_cache()
                                     st.success("User deleted")
                                     st.rerun()
                         else:
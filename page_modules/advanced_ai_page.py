@@ -754,6 +754,9 @@ def render_download_section(result: Dict, current_user: dict):
                     analysis_type='advanced_ai'
                 )
                 
+                from page_modules.reports_page import load_report_bundle
+                load_report_bundle.clear()
+                
                 st.success(f"✅ Saved to project: {project['name']}")
             except Exception as e:
                 st.error(f"Failed to save: {str(e)}")
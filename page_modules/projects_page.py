@@ -141,6 +141,9 @@ def render_projects_page(current_user):
                                         if proj_to_delete:
                                             db.delete(proj_to_delete)
                                             db.commit()
+                                    ProjectManager.clear_analysis_cache()
+                                    from page_modules.reports_page import load_report_bundle
+                                    load_report_bundle.clear()
                                     st.session_state[f'confirm_delete_{project["id"]}'] = False
                                     st.success("Project deleted successfully!")
                                     st.rerun()
@@ -1,18 +1,42 @@
+import html
 import streamlit as st
 from database import get_db_session
 from models import Team, TeamMember, User
 from datetime import datetime
 
-def render_team_page(current_user):
-    """Render team/members page for managing access and roles"""
-    
-    st.title("👥 Team & Members")
-    st.markdown("### Collaborate with Your Team")
+_TEAM_FEATURES_HTML = """
+<div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem;">
+    <div style="text-align: center; padding: 1.5rem;">
+        <div style="font-size: 3rem;">🤝</div>
+        <div style="font-weight: 600; margin-top: 0.5rem;">Collaborate</div>
+        <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Work together on projects</div>
+    </div>
+    <div style="text-align: center; padding: 1.5rem;">
+        <div style="font-size: 3rem;">🔒</div>
+        <div style="font-weight: 600; margin-top: 0.5rem;">Role-Based Access</div>
+        <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Control permissions</div>
+    </div>
+    <div style="text-align: center; padding: 1.5rem;">
+        <div style="font-size: 3rem;">📊</div>
+        <div style="font-weight: 600; margin-top: 0.5rem;">Shared Insights</div>
+        <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Share analyses</div>
+    </div>
+</div>
+"""
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_user_teams(user_id):
+    """Fetch owned and member teams for a user, cached per user for 60s.
     
-    # Get user's teams (owned and member of) - eagerly load members
+    Call load_user_teams.clear() after any team or membership mutation.
+    """
     with get_db_session() as db:
-        owned_teams_query = db.query(Team).filter(Team.owner_id == current_user['id']).all()
-        member_teams_query = db.query(Team).join(TeamMember).filter(TeamMember.user_id == current_user['id']).all()
+        owned_teams_query = db.query(Team).filter(Team.owner_id == user_id).all()
+        # Owned teams are excluded in SQL so member_teams never duplicates them
+        member_teams_query = db.query(Team).join(TeamMember).filter(
+            TeamMember.user_id == user_id,
+            Team.owner_id != user_id
+        ).all()
         
         # Convert to dicts with all needed data while session is open
         owned_teams = []
@@ -39,26 +63,133 @@ def render_team_page(current_user):
         
         member_teams = []
         for team in member_teams_query:
-            if team.id not in [t['id'] for t in owned_teams]:  # Avoid duplicates
-                team_dict = {
-                    'id': team.id,
-                    'name': team.name,
-                    'description': team.description,
-                    'owner_id': team.owner_id,
-                    'created_at': team.created_at,
-                    'members': []
-                }
-                for member in team.members:
-                    member_user = db.query(User).filter(User.id == member.user_id).first()
-                    team_dict['members'].append({
-                        'id': member.id,
-                        'user_id': member.user_id,
-                        'username': member_user.username if member_user else 'Unknown',
-                        'email': member_user.email if member_user else '',
-                        'role': member.role,
-                        'status': member.status
-                    })
-                member_teams.append(team_dict)
+            team_dict = {
+                'id': team.id,
+                'name': team.name,
+                'description': team.description,
+                'owner_id': team.owner_id,
+                'created_at': team.created_at,
+                'members': []
+            }
+            for member in team.members:
+                member_user = db.query(User).filter(User.id == member.user_id).first()
+                team_dict['members'].append({
+                    'id': member.id,
+                    'user_id': member.user_id,
+                    'username': member_user.username if member_user else 'Unknown',
+                    'email': member_user.email if member_user else '',
+                    'role': member.role,
+                    'status': member.status
+                })
+            member_teams.append(team_dict)
+    
+    return owned_teams, member_teams
+
+@st.fragment
+def _render_team(team, current_user):
+    """Render one team's expander; reruns independently of the other teams."""
+    is_owner = team['owner_id'] == current_user['id']
+    
+    with st.expander(f"{'👑' if is_owner else '👤'} {team['name']} ({len(team['members'])} members)"):
+        st.markdown(f"**Description:** {team['description'] or 'No description'}")
+        st.markdown(f"**Created:** {team['created_at'].strftime('%B %d, %Y') if hasattr(team['created_at'], 'strftime') else 'Recently'}")
+        
+        if is_owner:
+            st.success("✓ You are the owner of this team")
+        
+        st.markdown("---")
+        st.markdown("**Team Members:**")
+        
+        # Display team members as one grid block
+        member_rows = []
+        for member in team['members']:
+            owner_badge = " 👑" if member['user_id'] == team['owner_id'] else ""
+            member_rows.append(
+                f'<div><strong>{html.escape(member["username"])}</strong>{owner_badge}<br>'
+                f'<span style="font-size: 0.8rem; color: #64748B;">{html.escape(member["email"])}</span></div>'
+                f'<div style="font-weight: 600;">{html.escape(member["role"].upper())}</div>'
+            )
+        st.markdown(
+            '<div style="display: grid; grid-template-columns: 3fr 1fr; gap: 0.75rem; align-items: center; margin-bottom: 1rem;">'
+            + "".join(member_rows) + '</div>',
+            unsafe_allow_html=True
+        )
+        
+        # One remove control per team instead of a button per member
+        removable = [m for m in team['members'] if m['user_id'] != team['owner_id']]
+        if is_owner and removable:
+            col_select, col_remove = st.columns([3, 1])
+            
+            with col_select:
+                member_to_remove = st.selectbox(
+                    "Remove member",
+                    options=removable,
+                    format_func=lambda m: f"{m['username']} ({m['email']})",
+                    key=f"remove_select_{team['id']}"
+                )
+            
+            with col_remove:
+                st.markdown("<br>", unsafe_allow_html=True)
+                if st.button("Remove Selected", key=f"remove_{team['id']}", use_container_width=True):
+                    with get_db_session() as db:
+                        db.query(TeamMember).filter(TeamMember.id == member_to_remove['id']).delete(synchronize_session=False)
+                        db.commit()
+                    load_user_teams.clear()
+                    st.success(f"Removed {member_to_remove['username']} from team")
+                    st.rerun()
+        
+        if is_owner:
+            st.markdown("---")
+            st.markdown("**Invite New Member:**")
+            
+            col_email, col_role, col_invite = st.columns([3, 1, 1])
+            
+            with col_email:
+                invite_email = st.text_input("Email", key=f"invite_email_{team['id']}", placeholder="colleague@example.com")
+            
+            with col_role:
+                invite_role = st.selectbox("Role", options=["member", "admin"], key=f"invite_role_{team['id']}")
+            
+            with col_invite:
+                st.markdown("<br>", unsafe_allow_html=True)
+                if st.button("📧 Send Invite", key=f"send_invite_{team['id']}", use_container_width=True):
+                    if invite_email:
+                        with get_db_session() as db:
+                            invited_user = db.query(User).filter(User.email == invite_email).first()
+                            
+                            if invited_user:
+                                existing_member = db.query(TeamMember).filter(
+                                    TeamMember.team_id == team['id'],
+                                    TeamMember.user_id == invited_user.id
+                                ).first()
+                                
+                                if not existing_member:
+                                    new_member = TeamMember(
+                                        team_id=team['id'],
+                                        user_id=invited_user.id,
+                                        role=invite_role,
+                                        status='invited'
+                                    )
+                                    db.add(new_member)
+                                    db.commit()
+                                    load_user_teams.clear()
+                                    st.success(f"✅ Invitation sent to {invite_email}!")
+                                    st.rerun()
+                                else:
+                                    st.warning("User is already a team member")
+                            else:
+                                st.error("User not found. They need to create an account first.")
+                    else:
+                        st.error("Please enter an email address")
+
+def render_team_page(current_user):
+    """Render team/members page for managing access and roles"""
+    
+    st.title("👥 Team & Members")
+    st.markdown("### Collaborate with Your Team")
+    
+    # Get user's teams (owned and member of), cached across reruns
+    owned_teams, member_teams = load_user_teams(current_user['id'])
     
     # Tabs for different views
     tab1, tab2, tab3 = st.tabs(["My Teams", "Create Team", "Invitations"])
@@ -70,82 +201,7 @@ def render_team_page(current_user):
         
         if all_teams:
             for team in all_teams:
-                is_owner = team['owner_id'] == current_user['id']
-                
-                with st.expander(f"{'👑' if is_owner else '👤'} {team['name']} ({len(team['members'])} members)"):
-                    st.markdown(f"**Description:** {team['description'] or 'No description'}")
-                    st.markdown(f"**Created:** {team['created_at'].strftime('%B %d, %Y') if hasattr(team['created_at'], 'strftime') else 'Recently'}")
-                    
-                    if is_owner:
-                        st.success("✓ You are the owner of this team")
-                    
-                    st.markdown("---")
-                    st.markdown("**Team Members:**")
-                    
-                    # Display team members
-                    for member in team['members']:
-                        col_member, col_role, col_actions = st.columns([3, 1, 1])
-                        
-                        with col_member:
-                            owner_badge = " 👑" if member['user_id'] == team['owner_id'] else ""
-                            st.markdown(f"**{member['username']}**{owner_badge}")
-                            st.caption(member['email'])
-                        
-                        with col_role:
-                            st.markdown(f"**{member['role'].upper()}**")
-                        
-                        with col_actions:
-                            if is_owner and member['user_id'] != team['owner_id']:
-                                if st.button("Remove", key=f"remove_{member['id']}", use_container_width=True):
-                                    with get_db_session() as db:
-                                        member_to_remove = db.query(TeamMember).filter(TeamMember.id == member['id']).first()
-                                        db.delete(member_to_remove)
-                                        db.commit()
-                                    st.success(f"Removed {member['username']} from team")
-                                    st.rerun()
-                    
-                    if is_owner:
-                        st.markdown("---")
-                        st.markdown("**Invite New Member:**")
-                        
-                        col_email, col_role, col_invite = st.columns([3, 1, 1])
-                        
-                        with col_email:
-                            invite_email = st.text_input("Email", key=f"invite_email_{team['id']}", placeholder="colleague@example.com")
-                        
-                        with col_role:
-                            invite_role = st.selectbox("Role", options=["member", "admin"], key=f"invite_role_{team['id']}")
-                        
-                        with col_invite:
-                            st.markdown("<br>", unsafe_allow_html=True)
-                            if st.button("📧 Send Invite", key=f"send_invite_{team['id']}", use_container_width=True):
-                                if invite_email:
-                                    with get_db_session() as db:
-                                        invited_user = db.query(User).filter(User.email == invite_email).first()
-                                        
-                                        if invited_user:
-                                            existing_member = db.query(TeamMember).filter(
-                                                TeamMember.team_id == team['id'],
-                                                TeamMember.user_id == invited_user.id
-                                            ).first()
-                                            
-                                            if not existing_member:
-                                                new_member = TeamMember(
-                                                    team_id=team['id'],
-                                                    user_id=invited_user.id,
-                                                    role=invite_role,
-                                                    status='invited'
-                                                )
-                                                db.add(new_member)
-                                                db.commit()
-                                                st.success(f"✅ Invitation sent to {invite_email}!")
-                                                st.rerun()
-                                            else:
-                                                st.warning("User is already a team member")
-                                        else:
-                                            st.error("User not found. They need to create an account first.")
-                                else:
-                                    st.error("Please enter an email address")
+                _render_team(team, current_user)
         else:
             st.info("You're not part of any teams yet. Create your first team to collaborate!")
     
@@ -180,6 +236,7 @@ def render_team_page(current_user):
                         db.add(owner_member)
                         db.commit()
                     
+                    load_user_teams.clear()
                     st.success(f"✅ Team '{team_name}' created successfully!")
                     st.rerun()
                 else:
@@ -211,40 +268,38 @@ def render_team_page(current_user):
         
         if pending_invites:
             for invite in pending_invites:
-                col_info, col_actions = st.columns([3, 1])
-                
-                with col_info:
-                    st.markdown(f"""
-                    <div style="background: white; padding: 1rem; border-radius: 8px; border: 1px solid #E5E7EB;">
-                        <div style="font-weight: 600; font-size: 1.125rem; margin-bottom: 0.5rem;">{invite['team_name']}</div>
-                        <div style="font-size: 0.875rem; color: #64748B;">
-                            Invited by: {invite['owner_username']} ({invite['owner_email']})<br>
-                            Role: {invite['role'].upper()}
-                        </div>
+                st.markdown(f"""
+                <div style="background: white; padding: 1rem; border-radius: 8px; border: 1px solid #E5E7EB;">
+                    <div style="font-weight: 600; font-size: 1.125rem; margin-bottom: 0.5rem;">{invite['team_name']}</div>
+                    <div style="font-size: 0.875rem; color: #64748B;">
+                        Invited by: {invite['owner_username']} ({invite['owner_email']})<br>
+                        Role: {invite['role'].upper()}
                     </div>
-                    """, unsafe_allow_html=True)
+                </div>
+                """, unsafe_allow_html=True)
                 
-                with col_actions:
-                    col_accept, col_decline = st.columns(2)
-                    
-                    with col_accept:
-                        if st.button("✅ Accept", key=f"accept_{invite['id']}", use_container_width=True):
-                            with get_db_session() as db:
-                                member_to_update = db.query(TeamMember).filter(TeamMember.id == invite['id']).first()
-                                member_to_update.status = 'active'
-                                member_to_update.joined_at = datetime.utcnow()
-                                db.commit()
-                            st.success("Invitation accepted!")
-                            st.rerun()
-                    
-                    with col_decline:
-                        if st.button("❌ Decline", key=f"decline_{invite['id']}", use_container_width=True):
-                            with get_db_session() as db:
-                                member_to_delete = db.query(TeamMember).filter(TeamMember.id == invite['id']).first()
-                                db.delete(member_to_delete)
-                                db.commit()
-                            st.info("Invitation declined")
-                            st.rerun()
+                col_accept, col_decline = st.columns(2)
+                
+                with col_accept:
+                    if st.button("✅ Accept", key=f"accept_{invite['id']}", use_container_width=True):
+                        with get_db_session() as db:
+                            db.query(TeamMember).filter(TeamMember.id == invite['id']).update(
+                                {'status': 'active', 'joined_at': datetime.utcnow()},
+                                synchronize_session=False
+                            )
+                            db.commit()
+                        load_user_teams.clear()
+                        st.success("Invitation accepted!")
+                        st.rerun()
+                
+                with col_decline:
+                    if st.button("❌ Decline", key=f"decline_{invite['id']}", use_container_width=True):
+                        with get_db_session() as db:
+                            db.query(TeamMember).filter(TeamMember.id == invite['id']).delete(synchronize_session=False)
+                            db.commit()
+                        load_user_teams.clear()
+                        st.info("Invitation declined")
+                        st.rerun()
                 
                 st.markdown("<br>", unsafe_allow_html=True)
         else:
@@ -255,31 +310,4 @@ def render_team_page(current_user):
     # Team Benefits
     st.markdown("### ✨ Team Features")
     
-    col_feat1, col_feat2, col_feat3 = st.columns(3)
-    
-    with col_feat1:
-        st.markdown("""
-        <div style="text-align: center; padding: 1.5rem;">
-            <div style="font-size: 3rem;">🤝</div>
-            <div style="font-weight: 600; margin-top: 0.5rem;">Collaborate</div>
-            <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Work together on projects</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col_feat2:
-        st.markdown("""
-        <div style="text-align: center; padding: 1.5rem;">
-            <div style="font-size: 3rem;">🔒</div>
-            <div style="font-weight: 600; margin-top: 0.5rem;">Role-Based Access</div>
-            <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Control permissions</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col_feat3:
-        st.markdown("""
-        <div style="text-align: center; padding: 1.5rem;">
-            <div style="font-size: 3rem;">📊</div>
-            <div style="font-weight: 600; margin-top: 0.5rem;">Shared Insights</div>
-            <div style="font-size: 0.875rem; color: #64748B; margin-top: 0.25rem;">Share analyses</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_TEAM_FEATURES_HTML, unsafe_allow_html=True)
@@ -4,8 +4,28 @@ A valuation method where the DCF result is multiplied by explicit probabilities
 of success at each project stage (exploration, permitting, financing, construction).
 """
 
+import re
 import numpy as np
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+__all__ = [
+    'STAGE_SUCCESS_PROBABILITIES',
+    'RISK_FACTOR_ADJUSTMENTS',
+    'calculate_stage_probability',
+    'calculate_probability_weighted_dcf',
+    'calculate_probability_weighted_dcf_batch',
+    'safe_float',
+    'safe_int',
+    'generate_probability_dcf_from_extraction'
+]
 
 STAGE_SUCCESS_PROBABILITIES = {
     'grassroots': {
@@ -99,6 +119,71 @@ RISK_FACTOR_ADJUSTMENTS = {
     }
 }
 
+# Freeze the tables: the lookup arrays below are derived from them once at import,
+# so in-place edits would silently desynchronize the two
+STAGE_SUCCESS_PROBABILITIES = MappingProxyType({
+    stage: MappingProxyType(probs) for stage, probs in STAGE_SUCCESS_PROBABILITIES.items()
+})
+RISK_FACTOR_ADJUSTMENTS = MappingProxyType({
+    factor: MappingProxyType(values) for factor, values in RISK_FACTOR_ADJUSTMENTS.items()
+})
+
+# Structure-of-arrays view of STAGE_SUCCESS_PROBABILITIES: one contiguous
+# (stage x gate) float64 matrix, with name -> row index lookup
+_STAGE_NAMES = tuple(STAGE_SUCCESS_PROBABILITIES)
+_GATE_NAMES = (
+    'exploration_success',
+    'resource_definition',
+    'permitting_approval',
+    'financing_secured',
+    'construction_complete',
+    'production_ramp'
+)
+_STAGE_PROB_MAT = np.array(
+    [[STAGE_SUCCESS_PROBABILITIES[s][g] for g in _GATE_NAMES] for s in _STAGE_NAMES],
+    dtype=np.float64
+)
+_STAGE_IDX = {name: i for i, name in enumerate(_STAGE_NAMES)}
+
+# Integer-coded lookup tables for the batch API. Stage codes index _STAGE_PROB_MAT;
+# factor codes follow the key order of RISK_FACTOR_ADJUSTMENTS, and the extra trailing
+# entry of each factor array is the fallback used by the scalar path for unknown keys.
+_JUR = np.array([*RISK_FACTOR_ADJUSTMENTS['jurisdiction'].values(), 0.85])
+_COMM = np.array([*RISK_FACTOR_ADJUSTMENTS['commodity_risk'].values(), 0.90])
+_TECH = np.array([*RISK_FACTOR_ADJUSTMENTS['technical_complexity'].values(), 0.90])
+
+# Name -> code maps for encoding categorical inputs once, ahead of the batch API
+_JUR_INDEX = {name: i for i, name in enumerate(RISK_FACTOR_ADJUSTMENTS['jurisdiction'])}
+_COMM_INDEX = {name: i for i, name in enumerate(RISK_FACTOR_ADJUSTMENTS['commodity_risk'])}
+_TECH_INDEX = {name: i for i, name in enumerate(RISK_FACTOR_ADJUSTMENTS['technical_complexity'])}
+
+# Risk-adjusted/base NPV ratio thresholds and the recommendation each band maps to
+_REC_THRESHOLDS = np.array([0.10, 0.25, 0.50])
+_REC_TABLE = (
+    ("High Risk - Consider only with portfolio diversification", "red"),
+    ("Hold - Significant execution risk embedded", "orange"),
+    ("Buy - Moderate probability-adjusted upside", "blue"),
+    ("Strong Buy - High probability of value realization", "green")
+)
+
+# NPV sensitivity scenarios applied to the base case
+_SENSITIVITY_FACTORS = 1 + np.array([-0.20, -0.10, 0.10, 0.20])
+_SENSITIVITY_LABELS = ('-20%', '-10%', '+10%', '+20%')
+# Shared result for a zero base NPV; treat as read-only (kept a plain dict so it stays JSON-serializable)
+_EMPTY_SENSITIVITY = {}
+
+# Keyword classifiers for free-text jurisdiction / complexity fields
+# (zero-width lookahead so overlapping keywords like "perusa" are all seen;
+# the best tier mentioned anywhere wins)
+_JUR_TIER_RE = re.compile(
+    r'(?=(?P<tier_1>canada|australia|usa|tier ?1)'
+    r'|(?P<tier_2>chile|peru|mexico|tier ?2)'
+    r'|(?P<tier_3>tier ?3|africa|asia))'
+)
+_TECH_SIMPLE_RE = re.compile(r'simple|straightforward')
+_TECH_COMPLEX_RE = re.compile(r'complex|difficult')
+_TECH_HIGHLY_RE = re.compile(r'highly')
+
 
 def calculate_stage_probability(
     current_stage: str,
@@ -118,37 +203,74 @@ def calculate_stage_probability(
     Returns:
         Dictionary with stage probabilities and cumulative probability
     """
-    stage_key = current_stage.lower().replace(' ', '_').replace('-', '_')
-    if stage_key not in STAGE_SUCCESS_PROBABILITIES:
-        stage_key = 'early_exploration'
-    
-    base_probs = STAGE_SUCCESS_PROBABILITIES[stage_key].copy()
-    
-    jur_adj = RISK_FACTOR_ADJUSTMENTS['jurisdiction'].get(jurisdiction_tier, 0.85)
-    comm_adj = RISK_FACTOR_ADJUSTMENTS['commodity_risk'].get(commodity.lower(), 0.90)
-    tech_adj = RISK_FACTOR_ADJUSTMENTS['technical_complexity'].get(technical_complexity, 0.90)
-    
-    adjusted_probs = {}
-    cumulative_prob = 1.0
-    
-    for stage, prob in base_probs.items():
-        adjusted_prob = prob * jur_adj * comm_adj * tech_adj
-        adjusted_prob = min(adjusted_prob, 0.99)
-        adjusted_probs[stage] = round(adjusted_prob, 3)
-        cumulative_prob *= adjusted_prob
+    stage_probs, cumulative_prob, jur_adj, comm_adj, tech_adj, combined = _compute_stage_probs_cached(
+        _normalize_stage(current_stage), jurisdiction_tier, commodity.lower(), technical_complexity
+    )
     
     return {
-        'stage_probabilities': adjusted_probs,
-        'cumulative_probability': round(cumulative_prob, 4),
+        'stage_probabilities': dict(zip(_GATE_NAMES, stage_probs)),
+        'cumulative_probability': cumulative_prob,
         'risk_adjustments': {
             'jurisdiction': jur_adj,
             'commodity': comm_adj,
             'technical': tech_adj,
-            'combined': round(jur_adj * comm_adj * tech_adj, 3)
+            'combined': combined
         }
     }
 
 
+def _normalize_stage(current_stage: str) -> str:
+    """Map a free-form stage name onto a STAGE_SUCCESS_PROBABILITIES key"""
+    stage_key = current_stage.lower().replace(' ', '_').replace('-', '_')
+    if stage_key not in STAGE_SUCCESS_PROBABILITIES:
+        stage_key = 'early_exploration'
+    return stage_key
+
+
+def _stage_probs_kernel(base, jur_adj, comm_adj, tech_adj):
+    """Apply the risk factors to one stage's gate probabilities; returns (adjusted, cumulative)."""
+    # Multiply factor by factor (not by the combined product) so results match the scalar formula bit-for-bit
+    adjusted = np.minimum(base * jur_adj * comm_adj * tech_adj, 0.99)
+    return adjusted, adjusted.prod()
+
+
+if NUMBA_AVAILABLE:
+    _stage_probs_kernel = njit('Tuple((float64[:], float64))(float64[:], float64, float64, float64)', cache=True)(_stage_probs_kernel)
+
+
+@lru_cache(maxsize=1024)
+def _compute_stage_probs_cached(
+    stage_key: str,
+    jurisdiction_tier: str,
+    commodity: str,
+    technical_complexity: str
+) -> Tuple[Tuple[float, ...], float, float, float, float, float]:
+    """
+    Numeric core of calculate_stage_probability, memoized over the small
+    categorical input space. Returns already-rounded values as immutable tuples.
+    """
+    jur_adj = RISK_FACTOR_ADJUSTMENTS['jurisdiction'].get(jurisdiction_tier, 0.85)
+    comm_adj = RISK_FACTOR_ADJUSTMENTS['commodity_risk'].get(commodity, 0.90)
+    tech_adj = RISK_FACTOR_ADJUSTMENTS['technical_complexity'].get(technical_complexity, 0.90)
+    
+    adjusted, cumulative_prob = _stage_probs_kernel(_STAGE_PROB_MAT[_STAGE_IDX[stage_key]], jur_adj, comm_adj, tech_adj)
+    
+    return (
+        tuple(round(v, 3) for v in adjusted.tolist()),
+        round(float(cumulative_prob), 4),
+        jur_adj,
+        comm_adj,
+        tech_adj,
+        round(jur_adj * comm_adj * tech_adj, 3)
+    )
+
+
+@lru_cache(maxsize=1024)
+def _probability_percents(cumulative_prob: float) -> Tuple[float, float]:
+    """Rounded probability % and NPV discount % for a cumulative probability"""
+    return round(cumulative_prob * 100, 2), round((1 - cumulative_prob) * 100, 2)
+
+
 def calculate_probability_weighted_dcf(
     base_npv: float,
     base_irr: float,
@@ -183,43 +305,36 @@ def calculate_probability_weighted_dcf(
     Returns:
         Comprehensive probability-weighted DCF analysis
     """
-    prob_analysis = calculate_stage_probability(
-        current_stage, 
-        jurisdiction_tier, 
-        commodity, 
-        technical_complexity
+    # Go straight to the cached core rather than through calculate_stage_probability,
+    # whose wrapper dict would only be unpacked again below
+    stage_probs, cumulative_prob, jur_adj, comm_adj, tech_adj, combined = _compute_stage_probs_cached(
+        _normalize_stage(current_stage), jurisdiction_tier, commodity.lower(), technical_complexity
     )
     
-    cumulative_prob = prob_analysis['cumulative_probability']
-    
     risk_adjusted_npv = base_npv * cumulative_prob
     
     if annual_cash_flows is None and all([initial_capex, annual_revenue, annual_opex]):
         annual_cash_flow = annual_revenue - annual_opex
         annual_cash_flows = [-initial_capex] + [annual_cash_flow] * project_life_years
     
-    npv_sensitivity = {}
-    if base_npv != 0:
-        for adj in [-0.20, -0.10, 0.10, 0.20]:
-            adjusted_npv = base_npv * (1 + adj)
-            risk_adj_npv = adjusted_npv * cumulative_prob
-            npv_sensitivity[f"{adj*100:+.0f}%"] = {
-                'base_npv': round(adjusted_npv, 2),
-                'risk_adjusted_npv': round(risk_adj_npv, 2)
+    if base_npv == 0:
+        npv_sensitivity = _EMPTY_SENSITIVITY
+    else:
+        adjusted_npv = base_npv * _SENSITIVITY_FACTORS
+        risk_adj_npv = adjusted_npv * cumulative_prob
+        npv_sensitivity = {
+            label: {
+                'base_npv': round(adj, 2),
+                'risk_adjusted_npv': round(risk_adj, 2)
             }
+            for label, adj, risk_adj in zip(_SENSITIVITY_LABELS, adjusted_npv.tolist(), risk_adj_npv.tolist())
+        }
     
-    if risk_adjusted_npv > base_npv * 0.5:
-        recommendation = "Strong Buy - High probability of value realization"
-        color = "green"
-    elif risk_adjusted_npv > base_npv * 0.25:
-        recommendation = "Buy - Moderate probability-adjusted upside"
-        color = "blue"
-    elif risk_adjusted_npv > base_npv * 0.10:
-        recommendation = "Hold - Significant execution risk embedded"
-        color = "orange"
-    else:
-        recommendation = "High Risk - Consider only with portfolio diversification"
-        color = "red"
+    probability_percent, npv_discount_pct = _probability_percents(cumulative_prob)
+    
+    # risk_adjusted_npv / base_npv reduces to the cumulative probability for a positive base
+    ratio = cumulative_prob if base_npv > 0 else 0.0
+    recommendation, color = _REC_TABLE[int(np.searchsorted(_REC_THRESHOLDS, ratio))]
     
     return {
         'base_case': {
@@ -230,14 +345,19 @@ def calculate_probability_weighted_dcf(
         },
         'probability_analysis': {
             'current_stage': current_stage,
-            'stage_probabilities': prob_analysis['stage_probabilities'],
+            'stage_probabilities': dict(zip(_GATE_NAMES, stage_probs)),
             'cumulative_probability': cumulative_prob,
-            'probability_percent': round(cumulative_prob * 100, 2),
-            'risk_adjustments': prob_analysis['risk_adjustments']
+            'probability_percent': probability_percent,
+            'risk_adjustments': {
+                'jurisdiction': jur_adj,
+                'commodity': comm_adj,
+                'technical': tech_adj,
+                'combined': combined
+            }
         },
         'risk_adjusted_valuation': {
             'risk_adjusted_npv': round(risk_adjusted_npv, 2),
-            'npv_discount_from_base': round((1 - cumulative_prob) * 100, 2),
+            'npv_discount_from_base': npv_discount_pct,
             'risk_adjusted_irr': round(base_irr * cumulative_prob * 100, 2)
         },
         'sensitivity_analysis': npv_sensitivity,
@@ -254,10 +374,66 @@ def calculate_probability_weighted_dcf(
     }
 
 
+def calculate_probability_weighted_dcf_batch(
+    base_npv: np.ndarray,
+    base_irr: np.ndarray,
+    stage_idx: np.ndarray,
+    jur_idx: np.ndarray,
+    comm_idx: np.ndarray,
+    tech_idx: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized risk-adjusted NPV for portfolio screening
+    
+    Args:
+        base_npv: Base case NPVs ($ millions), shape (N,)
+        base_irr: Base case IRRs (decimal), shape (N,)
+        stage_idx: Stage codes (row in _STAGE_PROB_MAT, see _STAGE_IDX)
+        jur_idx: Jurisdiction codes (position in RISK_FACTOR_ADJUSTMENTS['jurisdiction'],
+            or its length for the unknown-tier fallback)
+        comm_idx: Commodity codes, same convention as jur_idx
+        tech_idx: Technical complexity codes, same convention as jur_idx
+    
+    Returns:
+        Dictionary of (N,) arrays: cumulative_probability, risk_adjusted_npv,
+        risk_adjusted_irr (percent), npv_discount_from_base (percent) and
+        recommendation_code (index into _REC_TABLE); 'valuation' holds the
+        three valuation columns as one (N, 3) matrix
+    """
+    base_npv = np.asarray(base_npv, dtype=np.float64)
+    base_irr = np.asarray(base_irr, dtype=np.float64)
+    
+    adjusted = (_STAGE_PROB_MAT[stage_idx]
+                * _JUR[jur_idx][:, None]
+                * _COMM[comm_idx][:, None]
+                * _TECH[tech_idx][:, None])
+    np.minimum(adjusted, 0.99, out=adjusted)
+    cumulative_prob = adjusted.prod(axis=1).round(4)
+    
+    # Fused (N, 3) valuation: risk-adjusted NPV, risk-adjusted IRR %, NPV discount %
+    valuation = np.column_stack((base_npv, base_irr * 100, np.full_like(base_npv, -100.0))) * cumulative_prob[:, None]
+    valuation[:, 2] += 100.0
+    
+    # risk_adjusted_npv / base_npv is just the cumulative probability for a positive base
+    ratio = np.where(base_npv > 0, cumulative_prob, 0.0)
+    
+    return {
+        'cumulative_probability': cumulative_prob,
+        'valuation': valuation,
+        'risk_adjusted_npv': valuation[:, 0],
+        'risk_adjusted_irr': valuation[:, 1],
+        'npv_discount_from_base': valuation[:, 2],
+        'recommendation_code': np.searchsorted(_REC_THRESHOLDS, ratio)
+    }
+
+
 def safe_float(value, default: float = 0.0) -> float:
     """Safely convert value to float with default"""
     if value is None:
         return default
+    # Extracted JSON usually carries real numbers; skip the try block for them
+    if isinstance(value, (int, float)):
+        return float(value)
     try:
         return float(value)
     except (TypeError, ValueError):
@@ -268,12 +444,112 @@ def safe_int(value, default: int = 0) -> int:
     """Safely convert value to int with default"""
     if value is None:
         return default
+    if isinstance(value, int):
+        return int(value)
     try:
         return int(value)
     except (TypeError, ValueError):
         return default
 
 
+def _classify_project(project_info: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """
+    Normalize extracted project_info into (stage, jurisdiction tier, commodity,
+    technical complexity) keys understood by the risk tables
+    """
+    current_stage = project_info.get('development_stage') or 'early_exploration'
+    
+    jurisdiction = project_info.get('jurisdiction', 'tier_2')
+    if isinstance(jurisdiction, str):
+        tiers = {m.lastgroup for m in _JUR_TIER_RE.finditer(jurisdiction.lower())}
+        jurisdiction_tier = min(tiers) if tiers else 'tier_2'
+    else:
+        jurisdiction_tier = 'tier_2'
+    
+    commodity = project_info.get('primary_commodity', 'gold').lower()
+    
+    technical = project_info.get('technical_complexity') or 'moderate'
+    if isinstance(technical, str):
+        tech_lower = technical.lower()
+        if _TECH_SIMPLE_RE.search(tech_lower):
+            technical_complexity = 'simple'
+        elif _TECH_COMPLEX_RE.search(tech_lower):
+            technical_complexity = 'complex'
+        elif _TECH_HIGHLY_RE.search(tech_lower):
+            technical_complexity = 'highly_complex'
+        else:
+            technical_complexity = 'moderate'
+    else:
+        technical_complexity = 'moderate'
+    
+    return current_stage, jurisdiction_tier, commodity, technical_complexity
+
+
+def _encode(extracted_data: Dict[str, Any]) -> Tuple[int, int, int, int]:
+    """
+    Integer-code one extraction's categorical profile for
+    calculate_probability_weighted_dcf_batch (unknown keys map to the fallback slot)
+    """
+    project_info = extracted_data.get('project_info', {}) or {}
+    current_stage, jurisdiction_tier, commodity, technical_complexity = _classify_project(project_info)
+    return (
+        _STAGE_IDX[_normalize_stage(current_stage)],
+        _JUR_INDEX.get(jurisdiction_tier, len(_JUR_INDEX)),
+        _COMM_INDEX.get(commodity, len(_COMM_INDEX)),
+        _TECH_INDEX.get(technical_complexity, len(_TECH_INDEX))
+    )
+
+
+def _propagate_income_error(income_dcf_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap an upstream Income DCF failure as this engine's error result"""
+    return {
+        'error': 'insufficient_data',
+        'message': f"Cannot calculate probability-weighted DCF: Income DCF failed - {income_dcf_result.get('message', 'insufficient data')}",
+        'upstream_error': income_dcf_result.get('error'),
+        'missing_inputs': income_dcf_result.get('missing_inputs', [])
+    }
+
+
+def _base_case_from_first_principles(economics: Dict[str, Any], production: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fallback base case when no Income DCF result is available, with STRICT validation
+    
+    Returns:
+        {'npv': ..., 'irr': ...} or an insufficient_data error result
+    """
+    econ_get = economics.get
+    annual_prod = safe_float(production.get('annual_production') or econ_get('annual_production'), 0)
+    commodity_price = safe_float(econ_get('commodity_price'), 0)
+    aisc = safe_float(econ_get('aisc') or econ_get('all_in_sustaining_cost') or econ_get('operating_cost'), 0)
+    
+    # STRICT: Require ALL THREE inputs - no fabrication
+    missing_inputs = []
+    if annual_prod <= 0:
+        missing_inputs.append('annual_production')
+    if commodity_price <= 0:
+        missing_inputs.append('commodity_price')
+    if aisc <= 0:
+        missing_inputs.append('operating_cost')
+    
+    if len(missing_inputs) > 0:
+        return {
+            'error': 'insufficient_data',
+            'message': f'Cannot calculate probability-weighted DCF: missing {", ".join(missing_inputs)}',
+            'missing_inputs': missing_inputs
+        }
+    
+    # Only calculate if we have all inputs
+    mine_life = safe_int(econ_get('mine_life'), 15) or 15
+    capex = safe_float(econ_get('initial_capex'), 0)
+    annual_margin = annual_prod * (commodity_price - aisc)
+    annual_margin_millions = annual_margin / 1_000_000
+    base_npv = annual_margin_millions * mine_life * 0.6 - capex
+    return {
+        'npv': base_npv,
+        'irr': 0.15 if base_npv > 0 else 0.05
+    }
+
+
 def generate_probability_dcf_from_extraction(extracted_data: Dict[str, Any], income_dcf_result: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Generate Probability-Weighted DCF analysis from AI-extracted document data
@@ -299,48 +575,22 @@ def generate_probability_dcf_from_extraction(extracted_data: Dict[str, Any], inc
     
     # CRITICAL: Use calculated NPV from Income DCF, NOT document-reported NPV
     # Document-reported NPVs can be unrealistic or from different assumptions
-    
-    # If Income DCF returned an error, propagate it - don't fabricate values
-    if income_dcf_result and 'error' in income_dcf_result:
-        return {
-            'error': 'insufficient_data',
-            'message': f"Cannot calculate probability-weighted DCF: Income DCF failed - {income_dcf_result.get('message', 'insufficient data')}",
-            'upstream_error': income_dcf_result.get('error'),
-            'missing_inputs': income_dcf_result.get('missing_inputs', [])
-        }
-    
-    if income_dcf_result and 'valuation_summary' in income_dcf_result:
-        base_npv = income_dcf_result['valuation_summary'].get('npv', 0)
-        base_irr = income_dcf_result['valuation_summary'].get('irr_percent', 0) / 100
+    if income_dcf_result and 'valuation_summary' in income_dcf_result and 'error' not in income_dcf_result:
+        # Common path: base case comes straight from the Income DCF engine
+        summary = income_dcf_result['valuation_summary']
+        base_npv = summary.get('npv', 0)
+        base_irr = summary.get('irr_percent', 0) / 100
+    elif income_dcf_result and 'error' in income_dcf_result:
+        # If Income DCF returned an error, propagate it - don't fabricate values
+        return _propagate_income_error(income_dcf_result)
     else:
-        # No Income DCF result - try to calculate from first principles with STRICT validation
-        annual_prod = safe_float(production.get('annual_production') or economics.get('annual_production'), 0)
-        commodity_price = safe_float(economics.get('commodity_price'), 0)
-        aisc = safe_float(economics.get('aisc') or economics.get('all_in_sustaining_cost') or economics.get('operating_cost'), 0)
-        
-        # STRICT: Require ALL THREE inputs - no fabrication
-        missing_inputs = []
-        if annual_prod <= 0:
-            missing_inputs.append('annual_production')
-        if commodity_price <= 0:
-            missing_inputs.append('commodity_price')
-        if aisc <= 0:
-            missing_inputs.append('operating_cost')
-        
-        if len(missing_inputs) > 0:
-            return {
-                'error': 'insufficient_data',
-                'message': f'Cannot calculate probability-weighted DCF: missing {", ".join(missing_inputs)}',
-                'missing_inputs': missing_inputs
-            }
-        
-        # Only calculate if we have all inputs
-        mine_life = safe_int(economics.get('mine_life'), 15) or 15
-        capex = safe_float(economics.get('initial_capex'), 0)
-        annual_margin = annual_prod * (commodity_price - aisc)
-        annual_margin_millions = annual_margin / 1_000_000
-        base_npv = annual_margin_millions * mine_life * 0.6 - capex
-        base_irr = 0.15 if base_npv > 0 else 0.05
+        first_principles = _base_case_from_first_principles(economics, production)
+        if 'error' in first_principles:
+            return first_principles
+        base_npv = first_principles['npv']
+        base_irr = first_principles['irr']
+    
+    econ_get = economics.get
     
     if base_npv <= 0:
         return {
@@ -349,45 +599,16 @@ def generate_probability_dcf_from_extraction(extracted_data: Dict[str, Any], inc
             'base_npv_calculated': base_npv
         }
     
-    current_stage = project_info.get('development_stage') or 'early_exploration'
-    project_life_raw = safe_int(economics.get('mine_life'), 15)
+    project_life_raw = safe_int(econ_get('mine_life'), 15)
     project_life = project_life_raw if project_life_raw > 0 else 15
-    raw_discount = safe_float(economics.get('discount_rate'), 8)
+    raw_discount = safe_float(econ_get('discount_rate'), 8)
     discount_rate = raw_discount / 100 if raw_discount > 1 else raw_discount if raw_discount > 0 else 0.08
     
-    jurisdiction = project_info.get('jurisdiction', 'tier_2')
-    if isinstance(jurisdiction, str):
-        jur_lower = jurisdiction.lower()
-        if any(t in jur_lower for t in ['canada', 'australia', 'usa', 'tier 1', 'tier1']):
-            jurisdiction_tier = 'tier_1'
-        elif any(t in jur_lower for t in ['chile', 'peru', 'mexico', 'tier 2', 'tier2']):
-            jurisdiction_tier = 'tier_2'
-        elif any(t in jur_lower for t in ['tier 3', 'tier3', 'africa', 'asia']):
-            jurisdiction_tier = 'tier_3'
-        else:
-            jurisdiction_tier = 'tier_2'
-    else:
-        jurisdiction_tier = 'tier_2'
-    
-    commodity = project_info.get('primary_commodity', 'gold').lower()
-    
-    technical = project_info.get('technical_complexity') or 'moderate'
-    if isinstance(technical, str):
-        tech_lower = technical.lower()
-        if 'simple' in tech_lower or 'straightforward' in tech_lower:
-            technical_complexity = 'simple'
-        elif 'complex' in tech_lower or 'difficult' in tech_lower:
-            technical_complexity = 'complex'
-        elif 'highly' in tech_lower:
-            technical_complexity = 'highly_complex'
-        else:
-            technical_complexity = 'moderate'
-    else:
-        technical_complexity = 'moderate'
+    current_stage, jurisdiction_tier, commodity, technical_complexity = _classify_project(project_info)
     
-    capex = safe_float(economics.get('initial_capex'), 200)
-    revenue = safe_float(economics.get('annual_revenue'), 100)
-    opex = safe_float(economics.get('annual_opex'), 50)
+    capex = safe_float(econ_get('initial_capex'), 200)
+    revenue = safe_float(econ_get('annual_revenue'), 100)
+    opex = safe_float(econ_get('annual_opex'), 50)
     
     return calculate_probability_weighted_dcf(
         base_npv=base_npv,
@@ -1,36 +1,235 @@
+from sqlalchemy import insert, func, select, bindparam
 from database import get_db_session
 from models import Project, Analysis, Document
+from scoring_engine import ScoringEngine
 from datetime import datetime
+from collections import namedtuple
+from dataclasses import dataclass
+from copy import deepcopy
+from contextlib import contextmanager
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Dict, Any
 
+# Shared read-only stand-in for missing sub-dicts, so misses don't allocate a fresh {}
+_EMPTY = MappingProxyType({})
+
+# _format_findings section prefixes; each section is prefix + bullets joined once
+_RATIONALE_PREFIX = "**Rationale:** "
+_FACTS_HEADER = "\n**Key Facts Found:**\n• "
+_MISSING_HEADER = "\n**Missing Information:**\n• "
+_BULLET_SEP = "\n• "
+
+_DOCUMENT_INSERT_BATCH = 50
+_ANALYSIS_YIELD_PER = 50
+
+# (category key, Analysis column prefix) for the core scoring categories
+_CORE_CATEGORY_COLUMNS = (
+    ('geology_prospectivity', 'geology'),
+    ('resource_potential', 'resource'),
+    ('economics', 'economics'),
+    ('legal_title', 'legal'),
+    ('permitting_esg', 'permitting'),
+    ('data_quality', 'data_quality'),
+)
+
+# Sustainability category keys double as their Analysis column prefixes
+_SUSTAINABILITY_CATEGORIES = ('environmental', 'social', 'governance', 'climate')
+
+# Detail fields merged from ai_analysis_raw into get_analysis_details categories
+_RAW_DETAIL_FIELDS = ('rationale', 'facts_found', 'missing_info')
+
+
+@dataclass(slots=True)
+class AnalysisSummary:
+    """One row of get_project_analyses.
+    
+    Slotted to avoid a per-row dict; supports analysis['key'] and analysis.get('key')
+    so call sites written against the previous dict results keep working.
+    """
+    id: int
+    total_score: float
+    risk_category: str
+    probability_of_success: float
+    analysis_type: str
+    created_at: datetime
+    recommendations: Any
+    # Category details for reports
+    geology_score: float
+    geology_weight: float
+    geology_contribution: float
+    geology_findings: str
+    resource_score: float
+    resource_weight: float
+    resource_contribution: float
+    resource_findings: str
+    economics_score: float
+    economics_weight: float
+    economics_contribution: float
+    economics_findings: str
+    legal_score: float
+    legal_weight: float
+    legal_contribution: float
+    legal_findings: str
+    permitting_score: float
+    permitting_weight: float
+    permitting_contribution: float
+    permitting_findings: str
+    data_quality_score: float
+    data_quality_weight: float
+    data_quality_contribution: float
+    data_quality_findings: str
+    # Sustainability scores
+    sustainability_score: float
+    environmental_score: float
+    environmental_weight: float
+    environmental_contribution: float
+    social_score: float
+    social_weight: float
+    social_contribution: float
+    governance_score: float
+    governance_weight: float
+    governance_contribution: float
+    climate_score: float
+    climate_weight: float
+    climate_contribution: float
+    has_sustainability: bool
+    # Raw AI analysis for structured category data (include_raw=True only)
+    ai_analysis_raw: Any = None
+    
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+@contextmanager
+def _session_scope(session=None):
+    """Reuse the caller's session when given, otherwise open (and commit/close) a new one"""
+    if session is not None:
+        yield session
+    else:
+        with get_db_session() as new_session:
+            yield new_session
+
+
+# Detached, immutable copy of an Analysis row that can outlive its session
+_AnalysisSnapshot = namedtuple('_AnalysisSnapshot', [column.key for column in Analysis.__table__.columns])
+
+
+@lru_cache(maxsize=512)
+def _fetch_analysis_row(analysis_id: int):
+    """Load one analysis as a snapshot (None if missing).
+    
+    Analyses are never edited after insert, so snapshots are cached per id;
+    save_analysis and ProjectManager.clear_analysis_cache clear it so a saved
+    or deleted id is never served stale. The JSON columns are shared by every
+    caller, so readers must copy them before handing them out.
+    """
+    with get_db_session() as session:
+        analysis = session.get(Analysis, analysis_id)
+        if not analysis:
+            return None
+        return _AnalysisSnapshot._make(getattr(analysis, field) for field in _AnalysisSnapshot._fields)
+
+# Columns serialized by get_project_analyses, in AnalysisSummary field order;
+# ai_analysis_raw is only selected on request
+_ANALYSIS_SUMMARY_COLUMNS = (
+    Analysis.id,
+    Analysis.total_score,
+    Analysis.risk_category,
+    Analysis.probability_of_success,
+    func.coalesce(Analysis.analysis_type, 'light_ai').label('analysis_type'),
+    Analysis.created_at,
+    Analysis.recommendations,
+    # Category details for reports
+    Analysis.geology_score,
+    Analysis.geology_weight,
+    Analysis.geology_contribution,
+    Analysis.geology_findings,
+    Analysis.resource_score,
+    Analysis.resource_weight,
+    Analysis.resource_contribution,
+    Analysis.resource_findings,
+    Analysis.economics_score,
+    Analysis.economics_weight,
+    Analysis.economics_contribution,
+    Analysis.economics_findings,
+    Analysis.legal_score,
+    Analysis.legal_weight,
+    Analysis.legal_contribution,
+    Analysis.legal_findings,
+    Analysis.permitting_score,
+    Analysis.permitting_weight,
+    Analysis.permitting_contribution,
+    Analysis.permitting_findings,
+    Analysis.data_quality_score,
+    Analysis.data_quality_weight,
+    Analysis.data_quality_contribution,
+    Analysis.data_quality_findings,
+    # Sustainability scores
+    Analysis.sustainability_score,
+    Analysis.environmental_score,
+    Analysis.environmental_weight,
+    Analysis.environmental_contribution,
+    Analysis.social_score,
+    Analysis.social_weight,
+    Analysis.social_contribution,
+    Analysis.governance_score,
+    Analysis.governance_weight,
+    Analysis.governance_contribution,
+    Analysis.climate_score,
+    Analysis.climate_weight,
+    Analysis.climate_contribution,
+    Analysis.sustainability_score.isnot(None).label('has_sustainability'),
+)
+
+# Read statements are built once at import and executed with bound parameters, so each
+# call skips rebuilding the clause tree and hits SQLAlchemy's compiled-statement cache
+_USER_PROJECTS_STMT = select(
+    Project,
+    func.count(Analysis.id)
+).outerjoin(
+    Analysis, Analysis.project_id == Project.id
+).where(
+    Project.user_id == bindparam('user_id')
+).group_by(Project.id).order_by(Project.updated_at.desc()).limit(bindparam('limit'))
+
+_PROJECT_ANALYSES_STMT = select(*_ANALYSIS_SUMMARY_COLUMNS).where(
+    Analysis.project_id == bindparam('project_id')
+).order_by(Analysis.created_at.desc()).execution_options(yield_per=_ANALYSIS_YIELD_PER)
+
+_PROJECT_ANALYSES_RAW_STMT = select(*_ANALYSIS_SUMMARY_COLUMNS, Analysis.ai_analysis_raw).where(
+    Analysis.project_id == bindparam('project_id')
+).order_by(Analysis.created_at.desc()).execution_options(yield_per=_ANALYSIS_YIELD_PER)
+
+_PROJECT_DOCUMENTS_STMT = select(Document).where(
+    Document.project_id == bindparam('project_id')
+).order_by(Document.uploaded_at.desc())
+
 class ProjectManager:
     
     @staticmethod
-    def create_project(user_id: int, name: str, description: str = None, location: str = None, commodity: str = None):
+    def create_project(user_id: int, name: str, description: str = None, location: str = None, commodity: str = None,
+                       session=None):
         """Create a new mining project. Returns a dict representation."""
-        with get_db_session() as session:
-            project = Project(
-                user_id=user_id,
-                name=name,
-                description=description,
-                location=location,
-                commodity=commodity,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            session.add(project)
-            session.flush()
-            session.refresh(project)
-            return {
-                'id': project.id,
-                'user_id': project.user_id,
-                'name': project.name,
-                'description': project.description,
-                'location': project.location,
-                'commodity': project.commodity,
-                'created_at': project.created_at,
-                'updated_at': project.updated_at
-            }
+        now = datetime.utcnow()
+        fields = {
+            'user_id': user_id,
+            'name': name,
+            'description': description,
+            'location': location,
+            'commodity': commodity,
+            'created_at': now,
+            'updated_at': now
+        }
+        with _session_scope(session) as session:
+            # INSERT ... RETURNING hands back the generated id in the same round-trip,
+            # replacing the flush + refresh SELECT; every other field is already known
+            project_id = session.execute(
+                insert(Project).values(**fields).returning(Project.id)
+            ).scalar_one()
+            return {'id': project_id, **fields}
     
     @staticmethod
     def _format_findings(category_data: Dict[str, Any]) -> str:
@@ -38,159 +237,168 @@ class ProjectManager:
         if not category_data:
             return ''
         
+        rationale = category_data.get('rationale')
+        facts = category_data.get('facts_found')
+        missing = category_data.get('missing_info')
+        
+        # Fast path: nothing to build, only pre-formatted findings (if any)
+        if not (rationale or facts or missing):
+            return category_data.get('findings', '')
+        
         findings_parts = []
         
         # Add rationale
-        if category_data.get('rationale'):
-            findings_parts.append(f"**Rationale:** {category_data['rationale']}")
+        if rationale:
+            findings_parts.append(_RATIONALE_PREFIX + str(rationale))
         
-        # Add facts found
-        facts = category_data.get('facts_found', [])
+        # Add facts found, one join per section rather than one append per bullet
         if facts:
-            findings_parts.append("\n**Key Facts Found:**")
-            for fact in facts:
-                findings_parts.append(f"• {fact}")
+            findings_parts.append(_FACTS_HEADER + _BULLET_SEP.join(map(str, facts)))
         
         # Add missing information
-        missing = category_data.get('missing_info', [])
         if missing:
-            findings_parts.append("\n**Missing Information:**")
-            for item in missing:
-                findings_parts.append(f"• {item}")
+            findings_parts.append(_MISSING_HEADER + _BULLET_SEP.join(map(str, missing)))
         
-        return '\n'.join(findings_parts) if findings_parts else category_data.get('findings', '')
+        return '\n'.join(findings_parts)
     
     @staticmethod
     def save_analysis(project_id: int, analysis_data: Dict[str, Any], scoring_data: Dict[str, Any], 
                      recommendations: List[str], scoring_template_id: int = None, narrative_data: Dict[str, Any] = None,
                      sustainability_data: Dict[str, Any] = None, sustainability_scoring: Dict[str, Any] = None,
-                     analysis_type: str = 'light_ai'):
+                     analysis_type: str = 'light_ai', session=None):
         """Save an analysis result to the database. Returns a dict representation.
         
         Args:
             analysis_type: 'light_ai' or 'advanced_ai' to identify the analysis source
+            session: optional open session to join instead of opening a new one
         """
-        with get_db_session() as session:
-            categories = analysis_data.get('categories', {})
-            contributions = scoring_data.get('category_contributions', {})
+        now = datetime.utcnow()
+        with _session_scope(session) as session:
+            categories = analysis_data.get('categories') or _EMPTY
+            contributions = scoring_data.get('category_contributions') or _EMPTY
+            
+            narrative_data = narrative_data or _EMPTY
+            sustainability_data = sustainability_data or _EMPTY
+            sustainability_scoring = sustainability_scoring or _EMPTY
             
-            narrative_data = narrative_data or {}
-            sustainability_data = sustainability_data or {}
-            sustainability_scoring = sustainability_scoring or {}
+            sust_categories = sustainability_data.get('sustainability_categories') or _EMPTY
+            sust_contributions = sustainability_scoring.get('category_contributions') or _EMPTY
             
-            sust_categories = sustainability_data.get('sustainability_categories', {})
-            sust_contributions = sustainability_scoring.get('category_contributions', {})
+            # Findings text per category sub-dict for this call only; keyed by id() so a
+            # dict shared between categories (or the empty fallback) is formatted once
+            findings_memo = {}
             
-            analysis = Analysis(
-                project_id=project_id,
-                scoring_template_id=scoring_template_id,
-                analysis_type=analysis_type,
-                total_score=scoring_data['total_score'],
-                risk_category=scoring_data.get('risk_band', scoring_data.get('risk_category', 'UNKNOWN')),
-                probability_of_success=scoring_data['probability_of_success'],
-                
-                geology_score=categories.get('geology_prospectivity', {}).get('score', 0),
-                geology_weight=contributions.get('geology_prospectivity', {}).get('weight', 0),
-                geology_contribution=contributions.get('geology_prospectivity', {}).get('contribution', 0),
-                geology_findings=ProjectManager._format_findings(categories.get('geology_prospectivity', {})),
-                
-                resource_score=categories.get('resource_potential', {}).get('score', 0),
-                resource_weight=contributions.get('resource_potential', {}).get('weight', 0),
-                resource_contribution=contributions.get('resource_potential', {}).get('contribution', 0),
-                resource_findings=ProjectManager._format_findings(categories.get('resource_potential', {})),
-                
-                economics_score=categories.get('economics', {}).get('score', 0),
-                economics_weight=contributions.get('economics', {}).get('weight', 0),
-                economics_contribution=contributions.get('economics', {}).get('contribution', 0),
-                economics_findings=ProjectManager._format_findings(categories.get('economics', {})),
-                
-                legal_score=categories.get('legal_title', {}).get('score', 0),
-                legal_weight=contributions.get('legal_title', {}).get('weight', 0),
-                legal_contribution=contributions.get('legal_title', {}).get('contribution', 0),
-                legal_findings=ProjectManager._format_findings(categories.get('legal_title', {})),
-                
-                permitting_score=categories.get('permitting_esg', {}).get('score', 0),
-                permitting_weight=contributions.get('permitting_esg', {}).get('weight', 0),
-                permitting_contribution=contributions.get('permitting_esg', {}).get('contribution', 0),
-                permitting_findings=ProjectManager._format_findings(categories.get('permitting_esg', {})),
-                
-                data_quality_score=categories.get('data_quality', {}).get('score', 0),
-                data_quality_weight=contributions.get('data_quality', {}).get('weight', 0),
-                data_quality_contribution=contributions.get('data_quality', {}).get('contribution', 0),
-                data_quality_findings=ProjectManager._format_findings(categories.get('data_quality', {})),
-                
-                recommendations=recommendations,
-                ai_analysis_raw=analysis_data,
-                
-                executive_summary=narrative_data.get('executive_summary'),
-                strategic_recommendations=narrative_data.get('strategic_recommendations'),
-                project_timeline=narrative_data.get('project_timeline'),
-                jurisdictional_context=narrative_data.get('jurisdictional_context'),
-                strategic_signals=narrative_data.get('strategic_signals'),
-                
-                sustainability_score=sustainability_scoring.get('sustainability_score'),
-                environmental_score=sust_categories.get('environmental', {}).get('score'),
-                environmental_weight=sust_contributions.get('environmental', {}).get('weight'),
-                environmental_contribution=sust_contributions.get('environmental', {}).get('contribution'),
-                environmental_findings=ProjectManager._format_findings(sust_categories.get('environmental', {})),
-                
-                social_score=sust_categories.get('social', {}).get('score'),
-                social_weight=sust_contributions.get('social', {}).get('weight'),
-                social_contribution=sust_contributions.get('social', {}).get('contribution'),
-                social_findings=ProjectManager._format_findings(sust_categories.get('social', {})),
-                
-                governance_score=sust_categories.get('governance', {}).get('score'),
-                governance_weight=sust_contributions.get('governance', {}).get('weight'),
-                governance_contribution=sust_contributions.get('governance', {}).get('contribution'),
-                governance_findings=ProjectManager._format_findings(sust_categories.get('governance', {})),
-                
-                climate_score=sust_categories.get('climate', {}).get('score'),
-                climate_weight=sust_contributions.get('climate', {}).get('weight'),
-                climate_contribution=sust_contributions.get('climate', {}).get('contribution'),
-                climate_findings=ProjectManager._format_findings(sust_categories.get('climate', {})),
-                
-                created_at=datetime.utcnow()
-            )
-            session.add(analysis)
-            session.flush()
-            session.refresh(analysis)
+            def format_findings(cat):
+                key = id(cat)
+                if key not in findings_memo:
+                    findings_memo[key] = ProjectManager._format_findings(cat)
+                return findings_memo[key]
+            
+            category_columns = {}
+            for cat_key, prefix in _CORE_CATEGORY_COLUMNS:
+                cat = categories.get(cat_key) or _EMPTY
+                contrib = contributions.get(cat_key) or _EMPTY
+                category_columns[f'{prefix}_score'] = cat.get('score', 0)
+                category_columns[f'{prefix}_weight'] = contrib.get('weight', 0)
+                category_columns[f'{prefix}_contribution'] = contrib.get('contribution', 0)
+                category_columns[f'{prefix}_findings'] = format_findings(cat)
+            
+            for cat_key in _SUSTAINABILITY_CATEGORIES:
+                cat = sust_categories.get(cat_key) or _EMPTY
+                contrib = sust_contributions.get(cat_key) or _EMPTY
+                category_columns[f'{cat_key}_score'] = cat.get('score')
+                category_columns[f'{cat_key}_weight'] = contrib.get('weight')
+                category_columns[f'{cat_key}_contribution'] = contrib.get('contribution')
+                category_columns[f'{cat_key}_findings'] = format_findings(cat)
+            
+            total_score = scoring_data['total_score']
+            risk_category = scoring_data.get('risk_band', scoring_data.get('risk_category', 'UNKNOWN'))
+            
+            # INSERT ... RETURNING id in one round-trip; everything else returned is already known
+            analysis_id = session.execute(
+                insert(Analysis).values(
+                    project_id=project_id,
+                    scoring_template_id=scoring_template_id,
+                    analysis_type=analysis_type,
+                    total_score=total_score,
+                    risk_category=risk_category,
+                    probability_of_success=scoring_data['probability_of_success'],
+                    
+                    recommendations=recommendations,
+                    ai_analysis_raw=analysis_data,
+                    
+                    executive_summary=narrative_data.get('executive_summary'),
+                    strategic_recommendations=narrative_data.get('strategic_recommendations'),
+                    project_timeline=narrative_data.get('project_timeline'),
+                    jurisdictional_context=narrative_data.get('jurisdictional_context'),
+                    strategic_signals=narrative_data.get('strategic_signals'),
+                    
+                    sustainability_score=sustainability_scoring.get('sustainability_score'),
+                    
+                    created_at=now,
+                    **category_columns
+                ).returning(Analysis.id)
+            ).scalar_one()
+            _fetch_analysis_row.cache_clear()
             return {
-                'id': analysis.id,
-                'project_id': analysis.project_id,
-                'total_score': analysis.total_score,
-                'risk_category': analysis.risk_category,
-                'analysis_type': analysis.analysis_type,
-                'created_at': analysis.created_at
+                'id': analysis_id,
+                'project_id': project_id,
+                'total_score': total_score,
+                'risk_category': risk_category,
+                'analysis_type': analysis_type,
+                'created_at': now
             }
     
     @staticmethod
-    def save_documents(project_id: int, documents_data: List[Dict[str, Any]]):
+    def save_documents(project_id: int, documents_data: List[Dict[str, Any]], session=None):
         """Save uploaded documents metadata to the database."""
+        if not documents_data:
+            return
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'project_id': project_id,
+                'file_name': doc_data.get('file_name', ''),
+                'file_type': doc_data.get('file_type', ''),
+                'file_size': doc_data.get('size', 0),
+                'extracted_text': doc_data.get('text', ''),
+                'extraction_success': doc_data.get('success', False),
+                'extraction_error': doc_data.get('error', ''),
+                'uploaded_at': now
+            }
+            for doc_data in documents_data
+        ]
+        
+        with _session_scope(session) as session:
+            # One executemany INSERT per batch instead of a unit-of-work add per row;
+            # batches keep the bound extracted_text payload per statement bounded
+            for start in range(0, len(rows), _DOCUMENT_INSERT_BATCH):
+                session.execute(insert(Document), rows[start:start + _DOCUMENT_INSERT_BATCH])
+    
+    @staticmethod
+    def save_project_submission(project_id: int, documents_data: List[Dict[str, Any]], analysis_kwargs: Dict[str, Any]):
+        """Save an analysis and its source documents in one transaction.
+        
+        Args:
+            analysis_kwargs: keyword arguments for save_analysis (everything but project_id)
+        
+        Returns the save_analysis dict. Nothing is committed unless both writes succeed,
+        so a failed analysis insert no longer leaves orphaned documents.
+        """
         with get_db_session() as session:
-            for doc_data in documents_data:
-                document = Document(
-                    project_id=project_id,
-                    file_name=doc_data.get('file_name', ''),
-                    file_type=doc_data.get('file_type', ''),
-                    file_size=doc_data.get('size', 0),
-                    extracted_text=doc_data.get('text', ''),
-                    extraction_success=doc_data.get('success', False),
-                    extraction_error=doc_data.get('error', ''),
-                    uploaded_at=datetime.utcnow()
-                )
-                session.add(document)
-            session.flush()
+            saved_analysis = ProjectManager.save_analysis(project_id=project_id, session=session, **analysis_kwargs)
+            ProjectManager.save_documents(project_id, documents_data, session=session)
+            return saved_analysis
     
     @staticmethod
-    def get_user_projects(user_id: int, limit: int = 50):
+    def get_user_projects(user_id: int, limit: int = 50, session=None):
         """Get all projects for a user."""
-        with get_db_session() as session:
-            projects = session.query(Project).filter(
-                Project.user_id == user_id
-            ).order_by(Project.updated_at.desc()).limit(limit).all()
+        with _session_scope(session) as session:
+            rows = session.execute(_USER_PROJECTS_STMT, {'user_id': user_id, 'limit': limit}).all()
             
             result = []
-            for project in projects:
+            for project, analysis_count in rows:
                 result.append({
                     'id': project.id,
                     'name': project.name,
@@ -199,193 +407,128 @@ class ProjectManager:
                     'commodity': project.commodity,
                     'created_at': project.created_at,
                     'updated_at': project.updated_at,
-                    'analysis_count': len(project.analyses)
+                    'analysis_count': analysis_count
                 })
             return result
     
     @staticmethod
-    def get_project_analyses(project_id: int):
-        """Get all analyses for a project with full details for reports."""
-        with get_db_session() as session:
-            analyses = session.query(Analysis).filter(
-                Analysis.project_id == project_id
-            ).order_by(Analysis.created_at.desc()).all()
-            
-            result = []
-            for analysis in analyses:
-                result.append({
-                    'id': analysis.id,
-                    'total_score': analysis.total_score,
-                    'risk_category': analysis.risk_category,
-                    'probability_of_success': analysis.probability_of_success,
-                    'analysis_type': analysis.analysis_type or 'light_ai',
-                    'created_at': analysis.created_at,
-                    'recommendations': analysis.recommendations,
-                    # Include all category details for reports
-                    'geology_score': analysis.geology_score,
-                    'geology_weight': analysis.geology_weight,
-                    'geology_contribution': analysis.geology_contribution,
-                    'geology_findings': analysis.geology_findings,
-                    'resource_score': analysis.resource_score,
-                    'resource_weight': analysis.resource_weight,
-                    'resource_contribution': analysis.resource_contribution,
-                    'resource_findings': analysis.resource_findings,
-                    'economics_score': analysis.economics_score,
-                    'economics_weight': analysis.economics_weight,
-                    'economics_contribution': analysis.economics_contribution,
-                    'economics_findings': analysis.economics_findings,
-                    'legal_score': analysis.legal_score,
-                    'legal_weight': analysis.legal_weight,
-                    'legal_contribution': analysis.legal_contribution,
-                    'legal_findings': analysis.legal_findings,
-                    'permitting_score': analysis.permitting_score,
-                    'permitting_weight': analysis.permitting_weight,
-                    'permitting_contribution': analysis.permitting_contribution,
-                    'permitting_findings': analysis.permitting_findings,
-                    'data_quality_score': analysis.data_quality_score,
-                    'data_quality_weight': analysis.data_quality_weight,
-                    'data_quality_contribution': analysis.data_quality_contribution,
-                    'data_quality_findings': analysis.data_quality_findings,
-                    # Include raw AI analysis for structured category data
-                    'ai_analysis_raw': analysis.ai_analysis_raw,
-                    # Sustainability scores
-                    'sustainability_score': analysis.sustainability_score,
-                    'environmental_score': analysis.environmental_score,
-                    'environmental_weight': analysis.environmental_weight,
-                    'environmental_contribution': analysis.environmental_contribution,
-                    'social_score': analysis.social_score,
-                    'social_weight': analysis.social_weight,
-                    'social_contribution': analysis.social_contribution,
-                    'governance_score': analysis.governance_score,
-                    'governance_weight': analysis.governance_weight,
-                    'governance_contribution': analysis.governance_contribution,
-                    'climate_score': analysis.climate_score,
-                    'climate_weight': analysis.climate_weight,
-                    'climate_contribution': analysis.climate_contribution
-                })
-            return result
+    def get_project_analyses(project_id: int, include_raw: bool = False, session=None):
+        """Get all analyses for a project with full details for reports.
+        
+        Args:
+            include_raw: also return the (potentially large) ai_analysis_raw JSON
+            session: optional open session to join instead of opening a new one
+        """
+        return list(ProjectManager.iter_project_analyses(project_id, include_raw=include_raw, session=session))
+    
+    @staticmethod
+    def iter_project_analyses(project_id: int, include_raw: bool = False, session=None):
+        """Yield a project's analyses newest first, streaming rows from the server in chunks.
+        
+        Same arguments and AnalysisSummary rows as get_project_analyses; the session stays
+        open until the generator is exhausted or closed.
+        """
+        stmt = _PROJECT_ANALYSES_RAW_STMT if include_raw else _PROJECT_ANALYSES_STMT
+        
+        with _session_scope(session) as session:
+            for row in session.execute(stmt, {'project_id': project_id}):
+                yield AnalysisSummary(*row)
+    
+    @staticmethod
+    def clear_analysis_cache():
+        """Drop cached analysis snapshots; call after deleting projects or analyses."""
+        _fetch_analysis_row.cache_clear()
     
     @staticmethod
     def get_analysis_details(analysis_id: int):
         """Get complete details of a specific analysis."""
-        with get_db_session() as session:
-            analysis = session.query(Analysis).filter(Analysis.id == analysis_id).first()
-            
-            if not analysis:
-                return None
-            
-            # Build base categories with scores and weights
-            categories = {
-                'geology_prospectivity': {
-                    'score': analysis.geology_score,
-                    'weight': analysis.geology_weight,
-                    'contribution': analysis.geology_contribution,
-                    'findings': analysis.geology_findings
-                },
-                'resource_potential': {
-                    'score': analysis.resource_score,
-                    'weight': analysis.resource_weight,
-                    'contribution': analysis.resource_contribution,
-                    'findings': analysis.resource_findings
-                },
-                'economics': {
-                    'score': analysis.economics_score,
-                    'weight': analysis.economics_weight,
-                    'contribution': analysis.economics_contribution,
-                    'findings': analysis.economics_findings
-                },
-                'legal_title': {
-                    'score': analysis.legal_score,
-                    'weight': analysis.legal_weight,
-                    'contribution': analysis.legal_contribution,
-                    'findings': analysis.legal_findings
-                },
-                'permitting_esg': {
-                    'score': analysis.permitting_score,
-                    'weight': analysis.permitting_weight,
-                    'contribution': analysis.permitting_contribution,
-                    'findings': analysis.permitting_findings
-                },
-                'data_quality': {
-                    'score': analysis.data_quality_score,
-                    'weight': analysis.data_quality_weight,
-                    'contribution': analysis.data_quality_contribution,
-                    'findings': analysis.data_quality_findings
+        analysis = _fetch_analysis_row(analysis_id)
+        if analysis is None:
+            return None
+        return ProjectManager._build_analysis_details(analysis)
+    
+    @staticmethod
+    def _build_analysis_details(analysis) -> Dict[str, Any]:
+        """Assemble the details dict from an analysis snapshot; builds fresh dicts on every call"""
+        # The snapshot is cached, so never hand out its JSON columns to callers that may mutate them
+        # Build base categories with scores and weights
+        categories = {
+            cat_key: {
+                'score': getattr(analysis, f'{prefix}_score'),
+                'weight': getattr(analysis, f'{prefix}_weight'),
+                'contribution': getattr(analysis, f'{prefix}_contribution'),
+                'findings': getattr(analysis, f'{prefix}_findings')
+            }
+            for cat_key, prefix in _CORE_CATEGORY_COLUMNS
+        }
+        
+        # Merge detailed category data from ai_analysis_raw if available
+        ai_raw = deepcopy(analysis.ai_analysis_raw)
+        if ai_raw and isinstance(ai_raw, dict):
+            raw_categories = ai_raw.get('categories', {})
+            for cat_key, cat in categories.items():
+                raw_cat_data = raw_categories.get(cat_key)
+                if raw_cat_data:
+                    # Add rationale, facts_found, and missing_info from raw data
+                    cat.update({
+                        field: raw_cat_data[field]
+                        for field in _RAW_DETAIL_FIELDS
+                        if raw_cat_data.get(field)
+                    })
+        
+        # Build sustainability categories if data exists
+        sustainability_scoring = None
+        sustainability_analysis = None
+        
+        if analysis.sustainability_score is not None:
+            sustainability_categories = {
+                cat_key: {
+                    'score': getattr(analysis, f'{cat_key}_score'),
+                    'weight': getattr(analysis, f'{cat_key}_weight'),
+                    'contribution': getattr(analysis, f'{cat_key}_contribution'),
+                    'findings': getattr(analysis, f'{cat_key}_findings')
                 }
+                for cat_key in _SUSTAINABILITY_CATEGORIES
             }
             
-            # Merge detailed category data from ai_analysis_raw if available
-            if analysis.ai_analysis_raw and isinstance(analysis.ai_analysis_raw, dict):
-                raw_categories = analysis.ai_analysis_raw.get('categories', {})
-                for cat_key in categories.keys():
-                    if cat_key in raw_categories:
-                        raw_cat_data = raw_categories[cat_key]
-                        # Add rationale, facts_found, and missing_info from raw data
-                        if raw_cat_data.get('rationale'):
-                            categories[cat_key]['rationale'] = raw_cat_data['rationale']
-                        if raw_cat_data.get('facts_found'):
-                            categories[cat_key]['facts_found'] = raw_cat_data['facts_found']
-                        if raw_cat_data.get('missing_info'):
-                            categories[cat_key]['missing_info'] = raw_cat_data['missing_info']
-            
-            # Build sustainability categories if data exists
-            sustainability_scoring = None
-            sustainability_analysis = None
-            
-            if analysis.sustainability_score is not None:
-                sustainability_categories = {
-                    'environmental': {
-                        'score': analysis.environmental_score,
-                        'weight': analysis.environmental_weight,
-                        'contribution': analysis.environmental_contribution,
-                        'findings': analysis.environmental_findings
-                    },
-                    'social': {
-                        'score': analysis.social_score,
-                        'weight': analysis.social_weight,
-                        'contribution': analysis.social_contribution,
-                        'findings': analysis.social_findings
-                    },
-                    'governance': {
-                        'score': analysis.governance_score,
-                        'weight': analysis.governance_weight,
-                        'contribution': analysis.governance_contribution,
-                        'findings': analysis.governance_findings
-                    },
-                    'climate': {
-                        'score': analysis.climate_score,
-                        'weight': analysis.climate_weight,
-                        'contribution': analysis.climate_contribution,
-                        'findings': analysis.climate_findings
+            # The stored score and contributions are what was computed at save time
+            sustainability_score = analysis.sustainability_score
+            rating, description = ScoringEngine.get_sustainability_rating(sustainability_score)
+            sustainability_scoring = {
+                'sustainability_score': sustainability_score,
+                'rating': rating,
+                'description': description,
+                'category_contributions': {
+                    cat_key: {
+                        'raw_score': cat['score'] or 0,
+                        'weight': cat['weight'] or 0,
+                        'contribution': cat['contribution'] or 0
                     }
+                    for cat_key, cat in sustainability_categories.items()
                 }
-                
-                from scoring_engine import ScoringEngine
-                sustainability_scoring = ScoringEngine.calculate_sustainability_score(sustainability_categories)
-                sustainability_analysis = {'sustainability_categories': sustainability_categories}
-            
-            return {
-                'id': analysis.id,
-                'project_id': analysis.project_id,
-                'total_score': analysis.total_score,
-                'risk_category': analysis.risk_category,
-                'probability_of_success': analysis.probability_of_success,
-                'analysis_type': analysis.analysis_type or 'light_ai',
-                'categories': categories,
-                'recommendations': analysis.recommendations,
-                'ai_analysis_raw': analysis.ai_analysis_raw,
-                'sustainability_scoring': sustainability_scoring,
-                'sustainability_analysis': sustainability_analysis,
-                'created_at': analysis.created_at
             }
+            sustainability_analysis = {'sustainability_categories': sustainability_categories}
+        
+        return {
+            'id': analysis.id,
+            'project_id': analysis.project_id,
+            'total_score': analysis.total_score,
+            'risk_category': analysis.risk_category,
+            'probability_of_success': analysis.probability_of_success,
+            'analysis_type': analysis.analysis_type or 'light_ai',
+            'categories': categories,
+            'recommendations': deepcopy(analysis.recommendations),
+            'ai_analysis_raw': ai_raw,
+            'sustainability_scoring': sustainability_scoring,
+            'sustainability_analysis': sustainability_analysis,
+            'created_at': analysis.created_at
+        }
     
     @staticmethod
-    def get_project_documents(project_id: int):
+    def get_project_documents(project_id: int, session=None):
         """Get all documents for a project."""
-        with get_db_session() as session:
-            documents = session.query(Document).filter(
-                Document.project_id == project_id
-            ).order_by(Document.uploaded_at.desc()).all()
+        with _session_scope(session) as session:
+            documents = session.execute(_PROJECT_DOCUMENTS_STMT, {'project_id': project_id}).scalars().all()
             
             result = []
             for doc in documents:
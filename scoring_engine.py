@@ -1,4 +1,25 @@
-from typing import Dict, Any, List
+import re
+from collections import namedtuple
+from typing import Dict, Any, List, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _build_keyword_automaton(keywords: List[str]):
+    """Aho-Corasick automaton matching every keyword in one pass over the text"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+# One category's scoring inputs, with non-list missing_info/facts_found already coerced to []
+CategoryInput = namedtuple('CategoryInput', 'score missing_items evidence')
 
 
 class ScoringEngine:
@@ -28,6 +49,12 @@ class ScoringEngine:
         'title', 'ownership', 'royalty', 'permit', 'license',
         'drilling', 'intercepts', 'assay', 'qaqc'
     ]
+    _CRITICAL_PATTERN = '|'.join(map(re.escape, CRITICAL_MISSING_KEYWORDS))
+    _CRITICAL_RE = re.compile(_CRITICAL_PATTERN, re.IGNORECASE)
+    # Matches once per critical item when missing items are joined with NUL separators
+    _CRITICAL_ITEM_RE = re.compile(f'(?:^|\x00)[^\x00]*?(?:{_CRITICAL_PATTERN})', re.IGNORECASE)
+    # Single-pass keyword matching when pyahocorasick is installed; the regexes above otherwise
+    _CRITICAL_AUTOMATON = _build_keyword_automaton(CRITICAL_MISSING_KEYWORDS) if AHOCORASICK_AVAILABLE else None
     
     SCORE_CAP_RULES_BY_SEVERITY = {
         'critical': {7: 5, 6: 6, 5: 6, 4: 7, 3: 7, 2: 8, 1: 9},  # Harsh: 7+ critical → max 5
@@ -45,11 +72,9 @@ class ScoringEngine:
     @staticmethod
     def classify_missing_item_severity(item: str) -> str:
         """Classify missing information as CRITICAL or MINOR based on content."""
-        item_lower = item.lower()
-        for critical_keyword in ScoringEngine.CRITICAL_MISSING_KEYWORDS:
-            if critical_keyword in item_lower:
-                return 'critical'
-        return 'minor'
+        if ScoringEngine._CRITICAL_AUTOMATON is not None:
+            return 'critical' if next(ScoringEngine._CRITICAL_AUTOMATON.iter(item.lower()), None) else 'minor'
+        return 'critical' if ScoringEngine._CRITICAL_RE.search(item) else 'minor'
     
     @staticmethod
     def validate_and_adjust_score(raw_score: float, missing_info_count: int, evidence_count: int, missing_items: List[str] = None) -> Dict[str, Any]:
@@ -68,72 +93,34 @@ class ScoringEngine:
         Returns:
             Dict with adjusted_score, penalty_applied, and reasoning
         """
-        adjusted_score = raw_score
-        penalties = []
-        
         # Classify missing items by severity if provided
-        critical_count = 0
-        minor_count = 0
-        
         if missing_items:
-            for item in missing_items:
-                severity = ScoringEngine.classify_missing_item_severity(item)
-                if severity == 'critical':
-                    critical_count += 1
-                else:
-                    minor_count += 1
+            critical_count = ScoringEngine.count_critical_missing(missing_items)
+            minor_count = len(missing_items) - critical_count
         else:
             # Fallback: assume all missing items are critical if not specified
             critical_count = missing_info_count
+            minor_count = 0
         
-        # Apply severity-based penalty
-        if critical_count >= 7:
-            cap = 5
-            if adjusted_score > cap:
-                penalties.append(f"Capped to {cap}/10 due to {critical_count} critical missing items")
-                adjusted_score = cap
-        elif critical_count >= 6:
-            cap = 6
-            if adjusted_score > cap:
-                penalties.append(f"Capped to {cap}/10 due to {critical_count} critical missing items")
-                adjusted_score = cap
-        elif critical_count >= 5:
-            cap = 6
-            if adjusted_score > cap:
-                penalties.append(f"Capped to {cap}/10 due to {critical_count} critical missing items")
-                adjusted_score = cap
-        elif critical_count >= 4:
-            cap = 7
-            if adjusted_score > cap:
-                penalties.append(f"Capped to {cap}/10 due to {critical_count} critical missing items")
-                adjusted_score = cap
-        # For 3 or fewer critical items, minor gaps alone don't reduce score
-        
-        # Enforce minimum evidence requirements (slightly relaxed)
-        max_iterations = 10
-        iteration = 0
-        while iteration < max_iterations:
-            iteration += 1
-            score_int = int(adjusted_score)
-            
-            if score_int < 6:
-                break
-            
-            min_evidence = ScoringEngine.MIN_EVIDENCE_REQUIREMENTS.get(score_int, 0)
-            
-            if evidence_count >= min_evidence:
-                break
-            
-            new_score = max(5, adjusted_score - 1)
-            if iteration == 1:
-                penalties.append(f"Insufficient evidence: need {min_evidence} items for score {score_int}/10, have only {evidence_count}")
-            adjusted_score = new_score
-            
-            if adjusted_score <= 5:
-                break
-        
+        return ScoringEngine.validate_and_adjust_score_precounted(raw_score, critical_count, minor_count, evidence_count)
+    
+    @staticmethod
+    def count_critical_missing(missing_items: List[str]) -> int:
+        """Count the missing items that classify as critical, in one regex pass over all of them."""
+        automaton = ScoringEngine._CRITICAL_AUTOMATON
+        if automaton is not None:
+            return sum(1 for item in missing_items if next(automaton.iter(item.lower()), None))
+        return len(ScoringEngine._CRITICAL_ITEM_RE.findall('\x00'.join(missing_items)))
+    
+    @staticmethod
+    def validate_and_adjust_score_precounted(raw_score: float, critical_count: int, minor_count: int, evidence_count: int) -> Dict[str, Any]:
+        """
+        Apply the severity caps and evidence requirements of validate_and_adjust_score
+        to missing items that have already been counted by severity.
+        """
+        adjusted_score, penalties = ScoringEngine._adjust_score(raw_score, critical_count, evidence_count)
         return {
-            'adjusted_score': round(adjusted_score, 1),
+            'adjusted_score': adjusted_score,
             'original_score': raw_score,
             'penalties_applied': penalties,
             'penalty_applied': len(penalties) > 0,
@@ -141,6 +128,50 @@ class ScoringEngine:
             'minor_missing': minor_count
         }
     
+    @staticmethod
+    def _adjust_score(raw_score: float, critical_count: int, evidence_count: int) -> Tuple[float, List[str]]:
+        """(adjusted_score rounded to 0.1, penalty messages) with no result dict in between"""
+        adjusted_score = raw_score
+        penalties = []
+        
+        # Apply severity-based penalty from the critical cap table (7+ saturates)
+        if critical_count >= 4:
+            cap = ScoringEngine.SCORE_CAP_RULES_BY_SEVERITY['critical'][min(critical_count, 7)]
+            if adjusted_score > cap:
+                penalties.append(f"Capped to {cap}/10 due to {critical_count} critical missing items")
+                adjusted_score = cap
+        # For 3 or fewer critical items, minor gaps alone don't reduce score
+        
+        # Enforce minimum evidence requirements (slightly relaxed): step down to the highest
+        # score the evidence supports, never below 5
+        score_int = int(adjusted_score)
+        min_evidence = ScoringEngine.MIN_EVIDENCE_REQUIREMENTS.get(score_int, 0)
+        if score_int >= 6 and evidence_count < min_evidence:
+            penalties.append(f"Insufficient evidence: need {min_evidence} items for score {score_int}/10, have only {evidence_count}")
+            supported = next(
+                (score for score in range(score_int - 1, 5, -1)
+                 if evidence_count >= ScoringEngine.MIN_EVIDENCE_REQUIREMENTS.get(score, 0)),
+                5
+            )
+            adjusted_score -= score_int - supported
+        
+        return round(adjusted_score, 1), penalties
+    
+    @staticmethod
+    def _normalize_categories(categories: Dict[str, Any], weights: Dict[str, float]) -> List[Tuple[str, float, CategoryInput]]:
+        """Pull each weighted category's score, missing items and evidence out of the analysis once."""
+        normalized = []
+        for category_key, weight in weights.items():
+            category_data = categories.get(category_key, {})
+            missing_info = category_data.get('missing_info', [])
+            evidence = category_data.get('facts_found', [])
+            normalized.append((category_key, weight, CategoryInput(
+                category_data.get('score', 0),
+                missing_info if isinstance(missing_info, list) else [],
+                evidence if isinstance(evidence, list) else []
+            )))
+        return normalized
+    
     @staticmethod
     def calculate_investment_score(categories: Dict[str, Any], custom_weights: Dict[str, float] = None) -> Dict[str, Any]:
         """
@@ -158,24 +189,14 @@ class ScoringEngine:
         total_score = 0.0
         category_contributions = {}
         
-        for category_key, weight in weights.items():
-            category_data = categories.get(category_key, {})
-            raw_score = category_data.get('score', 0)
+        for category_key, weight, category_input in ScoringEngine._normalize_categories(categories, weights):
+            raw_score = category_input.score
+            missing_count = len(category_input.missing_items)
+            evidence_count = len(category_input.evidence)
             
-            missing_info = category_data.get('missing_info', [])
-            evidence = category_data.get('facts_found', [])
-            missing_count = len(missing_info) if isinstance(missing_info, list) else 0
-            evidence_count = len(evidence) if isinstance(evidence, list) else 0
-            
-            # Pass missing items for severity classification
-            validation_result = ScoringEngine.validate_and_adjust_score(
-                raw_score, 
-                missing_count, 
-                evidence_count,
-                missing_items=missing_info if isinstance(missing_info, list) else []
-            )
-            
-            adjusted_score = validation_result['adjusted_score']
+            # Severity-classify the missing items in one pass
+            critical_count = ScoringEngine.count_critical_missing(category_input.missing_items) if missing_count else 0
+            adjusted_score, penalties = ScoringEngine._adjust_score(raw_score, critical_count, evidence_count)
             
             contribution = (adjusted_score / 10.0) * weight
             category_contributions[category_key] = {
@@ -183,12 +204,12 @@ class ScoringEngine:
                 'adjusted_score': adjusted_score,
                 'weight': weight,
                 'contribution': round(contribution, 2),
-                'penalty_applied': validation_result['penalty_applied'],
-                'penalties': validation_result['penalties_applied'],
+                'penalty_applied': len(penalties) > 0,
+                'penalties': penalties,
                 'missing_info_count': missing_count,
                 'evidence_count': evidence_count,
-                'critical_missing': validation_result.get('critical_missing', 0),
-                'minor_missing': validation_result.get('minor_missing', 0)
+                'critical_missing': critical_count,
+                'minor_missing': missing_count - critical_count
             }
             total_score += contribution
         
@@ -235,6 +256,11 @@ class ScoringEngine:
             category_data = sustainability_categories.get(category_key, {})
             raw_score = category_data.get('score', 0)
             
+            if raw_score == 0:
+                # No data for this category: nothing to scale, round or add
+                category_contributions[category_key] = {'raw_score': raw_score, 'weight': weight, 'contribution': 0.0}
+                continue
+            
             contribution = (raw_score / 10.0) * weight
             category_contributions[category_key] = {
                 'raw_score': raw_score,
@@ -244,19 +270,7 @@ class ScoringEngine:
             sustainability_score += contribution
         
         sustainability_score = round(sustainability_score, 2)
-        
-        if sustainability_score >= 80:
-            rating = "EXCELLENT"
-            description = "Industry-leading sustainability practices - ESG excellence"
-        elif sustainability_score >= 65:
-            rating = "GOOD"
-            description = "Strong sustainability performance - above industry standards"
-        elif sustainability_score >= 50:
-            rating = "MODERATE"
-            description = "Acceptable sustainability performance - meets basic standards"
-        else:
-            rating = "NEEDS IMPROVEMENT"
-            description = "Sustainability concerns - requires significant improvements"
+        rating, description = ScoringEngine.get_sustainability_rating(sustainability_score)
         
         return {
             'sustainability_score': sustainability_score,
@@ -265,6 +279,18 @@ class ScoringEngine:
             'category_contributions': category_contributions
         }
     
+    @staticmethod
+    def get_sustainability_rating(sustainability_score: float):
+        """Map a 0-100 sustainability score to its (rating, description) band"""
+        if sustainability_score >= 80:
+            return "EXCELLENT", "Industry-leading sustainability practices - ESG excellence"
+        elif sustainability_score >= 65:
+            return "GOOD", "Strong sustainability performance - above industry standards"
+        elif sustainability_score >= 50:
+            return "MODERATE", "Acceptable sustainability performance - meets basic standards"
+        else:
+            return "NEEDS IMPROVEMENT", "Sustainability concerns - requires significant improvements"
+    
     @staticmethod
     def calculate_risk_adjusted_npv(total_score: float, unrisked_npv: float) -> Dict[str, Any]:
         probability_of_success = total_score / 100.0
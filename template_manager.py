@@ -1,9 +1,37 @@
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple
+from sqlalchemy import select, case, or_
 from sqlalchemy.orm import Session
 from database import get_db_session
 from models import ScoringTemplate
 
 
+@lru_cache(maxsize=512)
+def _weights_as_percentages(fractions: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Stored weight fractions as rounded percentages; templates share few distinct weight sets"""
+    return tuple(round(fraction * 100, 1) for fraction in fractions)
+
+
+# Exactly the columns _to_dict reads. Read paths select these as plain rows, so fetching a
+# template costs one SELECT with no ORM instance or identity-map bookkeeping.
+_TEMPLATE_COLUMNS = (
+    ScoringTemplate.id,
+    ScoringTemplate.user_id,
+    ScoringTemplate.name,
+    ScoringTemplate.description,
+    ScoringTemplate.is_default,
+    ScoringTemplate.geology_weight,
+    ScoringTemplate.resource_weight,
+    ScoringTemplate.economics_weight,
+    ScoringTemplate.legal_weight,
+    ScoringTemplate.permitting_weight,
+    ScoringTemplate.data_quality_weight,
+    ScoringTemplate.created_at,
+    ScoringTemplate.updated_at,
+)
+
+
 class TemplateManager:
     """Manages CRUD operations for scoring templates"""
     
@@ -15,6 +43,8 @@ class TemplateManager:
         'permitting_esg': 10,
         'data_quality': 10
     }
+    # Read-only view handed out where callers only read the defaults, saving a copy per call
+    DEFAULT_WEIGHTS_VIEW = MappingProxyType(DEFAULT_WEIGHTS)
     
     @staticmethod
     def create_template(
@@ -26,7 +56,7 @@ class TemplateManager:
     ) -> Dict[str, Any]:
         """Create a new scoring template"""
         if weights is None:
-            weights = TemplateManager.DEFAULT_WEIGHTS.copy()
+            weights = TemplateManager.DEFAULT_WEIGHTS_VIEW
         
         # Validate weights sum to 100
         total_weight = sum(weights.values())
@@ -64,9 +94,9 @@ class TemplateManager:
     def get_template(template_id: int) -> Optional[Dict[str, Any]]:
         """Get a template by ID"""
         with get_db_session() as db:
-            template = db.query(ScoringTemplate).filter(
+            template = db.execute(select(*_TEMPLATE_COLUMNS).where(
                 ScoringTemplate.id == template_id
-            ).first()
+            )).first()
             
             if template:
                 return TemplateManager._to_dict(template)
@@ -76,9 +106,9 @@ class TemplateManager:
     def get_user_templates(user_id: int) -> List[Dict[str, Any]]:
         """Get all templates for a user"""
         with get_db_session() as db:
-            templates = db.query(ScoringTemplate).filter(
+            templates = db.execute(select(*_TEMPLATE_COLUMNS).where(
                 ScoringTemplate.user_id == user_id
-            ).order_by(ScoringTemplate.is_default.desc(), ScoringTemplate.created_at.desc()).all()
+            ).order_by(ScoringTemplate.is_default.desc(), ScoringTemplate.created_at.desc())).all()
             
             return [TemplateManager._to_dict(t) for t in templates]
     
@@ -86,10 +116,10 @@ class TemplateManager:
     def get_default_template(user_id: int) -> Optional[Dict[str, Any]]:
         """Get the user's default template"""
         with get_db_session() as db:
-            template = db.query(ScoringTemplate).filter(
+            template = db.execute(select(*_TEMPLATE_COLUMNS).where(
                 ScoringTemplate.user_id == user_id,
                 ScoringTemplate.is_default == True
-            ).first()
+            )).first()
             
             if template:
                 return TemplateManager._to_dict(template)
@@ -132,13 +162,14 @@ class TemplateManager:
                 template.data_quality_weight = weights.get('data_quality', 10) / 100
             
             if is_default is not None and is_default:
-                # Unset other defaults for this user
+                # Make this the user's only default in one statement; refreshed below
                 db.query(ScoringTemplate).filter(
                     ScoringTemplate.user_id == template.user_id,
-                    ScoringTemplate.id != template_id,
-                    ScoringTemplate.is_default == True
-                ).update({'is_default': False})
-                template.is_default = True
+                    or_(ScoringTemplate.is_default == True, ScoringTemplate.id == template_id)
+                ).update(
+                    {'is_default': case((ScoringTemplate.id == template_id, True), else_=False)},
+                    synchronize_session=False
+                )
             elif is_default is not None and not is_default:
                 template.is_default = False
             
@@ -179,29 +210,29 @@ class TemplateManager:
             return {'success': True, 'message': 'Template deleted successfully'}
     
     @staticmethod
-    def _to_dict(template: ScoringTemplate) -> Dict[str, Any]:
-        """Convert template to dictionary with weights as percentages"""
+    def _to_dict(template) -> Dict[str, Any]:
+        """Convert a template (ORM object or _TEMPLATE_COLUMNS row) to dictionary with weights as percentages"""
         return {
             'id': template.id,
             'user_id': template.user_id,
             'name': template.name,
             'description': template.description,
             'is_default': template.is_default,
-            'weights': {
-                'geology_prospectivity': round(template.geology_weight * 100, 1),
-                'resource_potential': round(template.resource_weight * 100, 1),
-                'economics': round(template.economics_weight * 100, 1),
-                'legal_title': round(template.legal_weight * 100, 1),
-                'permitting_esg': round(template.permitting_weight * 100, 1),
-                'data_quality': round(template.data_quality_weight * 100, 1)
-            },
+            'weights': dict(zip(TemplateManager.DEFAULT_WEIGHTS, _weights_as_percentages((
+                template.geology_weight,
+                template.resource_weight,
+                template.economics_weight,
+                template.legal_weight,
+                template.permitting_weight,
+                template.data_quality_weight
+            )))),
             'created_at': template.created_at,
             'updated_at': template.updated_at
         }
     
     @staticmethod
-    def get_weights_dict(template: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
-        """Get weights dictionary from template or return defaults"""
+    def get_weights_dict(template: Optional[Dict[str, Any]] = None) -> Mapping[str, float]:
+        """Get weights from template or the read-only defaults; copy with dict() before modifying"""
         if template and 'weights' in template:
             return template['weights']
-        return TemplateManager.DEFAULT_WEIGHTS.copy()
+        return TemplateManager.DEFAULT_WEIGHTS_VIEW
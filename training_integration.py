@@ -6,18 +6,30 @@ to improve accuracy through few-shot learning and retrieval-augmented generation
 """
 
 import json
+import time
+from collections import Counter, deque
+from functools import lru_cache
 from typing import List, Dict, Optional
+from sqlalchemy import select, func, case, and_
 from database import get_db_session
 from models import TrainingExample, TrainingCategory
 
 MAX_EXAMPLES_PER_PROMPT = 3
+MAX_COMBINED_EXAMPLES = 6
 MIN_QUALITY_SCORE = 7.0
+EXAMPLE_CACHE_TTL = 60  # seconds approved examples are served from memory
+
+# Ids of examples served since the last flush; usage_count is written in batches
+_pending_usage = deque()
 
 
 def get_approved_examples(category: str = None, subcategory: str = None, limit: int = MAX_EXAMPLES_PER_PROMPT) -> List[Dict]:
     """
     Retrieve approved training examples for use in prompts.
     
+    Results are served from memory for up to EXAMPLE_CACHE_TTL seconds; the
+    usage_count bumps for served examples are written by flush_usage_counts().
+    
     Args:
         category: Filter by category (e.g., 'resource_statement', 'financial_table')
         subcategory: Filter by subcategory
@@ -27,95 +39,244 @@ def get_approved_examples(category: str = None, subcategory: str = None, limit:
         List of example dictionaries with source_text and extracted_data
     """
     try:
-        with get_db_session() as db:
-            query = db.query(TrainingExample).filter(
-                TrainingExample.is_approved == True,
-                TrainingExample.quality_score >= MIN_QUALITY_SCORE
-            )
-            
-            if category:
-                query = query.filter(TrainingExample.category == category)
-            
-            if subcategory:
-                query = query.filter(TrainingExample.subcategory == subcategory)
-            
-            examples = query.order_by(
-                TrainingExample.quality_score.desc(),
-                TrainingExample.usage_count.asc()
-            ).limit(limit).all()
-            
-            result = []
-            for ex in examples:
-                result.append({
-                    'id': ex.id,
-                    'category': ex.category,
-                    'subcategory': ex.subcategory,
-                    'example_name': ex.example_name,
-                    'source_text': ex.source_text,
-                    'extracted_data': ex.extracted_data,
-                    'quality_score': ex.quality_score
-                })
-                
-                ex.usage_count = (ex.usage_count or 0) + 1
-            
-            db.commit()
-            return result
-            
+        examples = _fetch_approved_examples(category, subcategory, limit, _ttl_bucket())
     except Exception as e:
         return []
+    
+    _pending_usage.extend(ex['id'] for ex in examples)
+    return [dict(ex) for ex in examples]
 
 
-def format_examples_for_prompt(examples: List[Dict], format_type: str = 'extraction') -> str:
+def get_approved_examples_multi(categories: List[str], limit_per_category: int = MAX_EXAMPLES_PER_PROMPT) -> List[Dict]:
     """
-    Format training examples for inclusion in prompts.
+    Retrieve approved training examples for several categories in one query.
+    
+    Cached and usage-counted the same way as get_approved_examples().
     
     Args:
-        examples: List of example dictionaries
-        format_type: Type of formatting ('extraction', 'validation', 'financial')
+        categories: Categories to fetch, in the order the results should follow
+        limit_per_category: Maximum number of examples per category
     
     Returns:
-        Formatted string to include in prompts
+        List of example dictionaries, grouped by category in the given order
     """
-    if not examples:
-        return ""
+    try:
+        examples = _fetch_approved_examples_multi(tuple(categories), limit_per_category, _ttl_bucket())
+    except Exception as e:
+        return []
     
-    formatted_parts = []
+    _pending_usage.extend(ex['id'] for ex in examples)
+    return [dict(ex) for ex in examples]
+
+
+def flush_usage_counts():
+    """Write the usage_count bumps for examples served since the last flush."""
+    if not _pending_usage:
+        return
+    try:
+        with get_db_session() as db:
+            _write_usage_counts(db)
+    except Exception:
+        pass
+
+
+def _ttl_bucket() -> int:
+    # Part of the cache key, so cached results expire when the bucket rolls over
+    return int(time.time() // EXAMPLE_CACHE_TTL)
+
+
+def _drain_pending_usage() -> Counter:
+    # Several script threads drain the shared deque, so emptiness is only known from popleft
+    counts = Counter()
+    while True:
+        try:
+            counts[_pending_usage.popleft()] += 1
+        except IndexError:
+            return counts
+
+
+def _write_usage_counts(db):
+    counts = _drain_pending_usage()
+    if not counts:
+        return
     
-    for i, ex in enumerate(examples, 1):
-        if format_type == 'extraction':
-            formatted_parts.append(f"""
---- EXAMPLE {i}: {ex.get('example_name', 'Training Example')} ---
-CATEGORY: {ex.get('category', 'unknown')}
+    ids_by_count = {}
+    for example_id, count in counts.items():
+        ids_by_count.setdefault(count, []).append(example_id)
+    
+    try:
+        # Savepoint, so a failed bump leaves the caller's session usable
+        with db.begin_nested():
+            for count, example_ids in ids_by_count.items():
+                db.query(TrainingExample).filter(
+                    TrainingExample.id.in_(example_ids)
+                ).update(
+                    {'usage_count': func.coalesce(TrainingExample.usage_count, 0) + count},
+                    synchronize_session=False
+                )
+    except Exception:
+        # Requeue so the bumps are retried by the next write
+        _pending_usage.extend(counts.elements())
+        raise
+
+
+@lru_cache(maxsize=64)
+def _fetch_approved_examples(category: Optional[str], subcategory: Optional[str], limit: int, ttl_bucket: int) -> tuple:
+    with get_db_session() as db:
+        # Piggyback pending usage counts on the round trip a cache miss makes anyway;
+        # bookkeeping failures must never cost the prompt its examples
+        try:
+            _write_usage_counts(db)
+        except Exception:
+            pass
+        
+        query = db.query(TrainingExample).filter(
+            TrainingExample.is_approved == True,
+            TrainingExample.quality_score >= MIN_QUALITY_SCORE
+        )
+        
+        if category:
+            query = query.filter(TrainingExample.category == category)
+        
+        if subcategory:
+            query = query.filter(TrainingExample.subcategory == subcategory)
+        
+        examples = query.order_by(
+            TrainingExample.quality_score.desc(),
+            TrainingExample.usage_count.asc()
+        ).limit(limit).all()
+        
+        return tuple(_example_to_dict(ex) for ex in examples)
+
+
+@lru_cache(maxsize=64)
+def _fetch_approved_examples_multi(categories: tuple, limit_per_category: int, ttl_bucket: int) -> tuple:
+    with get_db_session() as db:
+        try:
+            _write_usage_counts(db)
+        except Exception:
+            pass
+        
+        ranked = select(
+            TrainingExample.id,
+            func.row_number().over(
+                partition_by=TrainingExample.category,
+                order_by=(TrainingExample.quality_score.desc(), TrainingExample.usage_count.asc())
+            ).label('rank')
+        ).where(
+            TrainingExample.is_approved == True,
+            TrainingExample.quality_score >= MIN_QUALITY_SCORE,
+            TrainingExample.category.in_(categories)
+        ).subquery()
+        
+        examples = db.query(TrainingExample).join(
+            ranked, TrainingExample.id == ranked.c.id
+        ).filter(ranked.c.rank <= limit_per_category).order_by(ranked.c.rank).all()
+        
+        category_order = {cat: i for i, cat in enumerate(categories)}
+        examples.sort(key=lambda ex: category_order[ex.category])
+        
+        return tuple(_example_to_dict(ex) for ex in examples)
+
+
+def _example_to_dict(ex: TrainingExample) -> Dict:
+    return {
+        'id': ex.id,
+        'category': ex.category,
+        'subcategory': ex.subcategory,
+        'example_name': ex.example_name,
+        'source_text': ex.source_text,
+        'extracted_data': ex.extracted_data,
+        'quality_score': ex.quality_score,
+        # Serialized once per cache fill instead of once per prompt build
+        '_pretty_extracted': _pretty_json(ex.extracted_data)
+    }
+
+
+def _pretty_json(data) -> str:
+    # Rows written as JSON text come back as str; indent their content rather than quoting it
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            pass
+    return json.dumps(data, indent=2)
+
+
+def _pretty_extracted(ex: Dict) -> str:
+    pretty = ex.get('_pretty_extracted')
+    return pretty if pretty is not None else json.dumps(ex.get('extracted_data', {}), indent=2)
+
+
+_EXTRACTION_TEMPLATE = """
+--- EXAMPLE {i}: {name} ---
+CATEGORY: {category}
 
 SOURCE TEXT:
-{ex.get('source_text', '')[:2000]}
+{source}
 
 CORRECT EXTRACTION:
-{json.dumps(ex.get('extracted_data', {}), indent=2)}
+{extracted}
 ---
-""")
-        elif format_type == 'validation':
-            formatted_parts.append(f"""
-REFERENCE EXAMPLE {i} ({ex.get('category', '')}):
-- Source: {ex.get('source_text', '')[:500]}...
-- Key values: {json.dumps(ex.get('extracted_data', {}), indent=2)}
-""")
-        elif format_type == 'financial':
-            extracted = ex.get('extracted_data', {})
-            formatted_parts.append(f"""
+"""
+
+_VALIDATION_TEMPLATE = """
+REFERENCE EXAMPLE {i} ({category}):
+- Source: {source}...
+- Key values: {extracted}
+"""
+
+_FINANCIAL_TEMPLATE = """
 FINANCIAL EXAMPLE {i}:
-Source: {ex.get('source_text', '')[:1000]}
+Source: {source}
 Extracted values:
-{json.dumps(extracted, indent=2)}
-""")
+{extracted}
+"""
+
+# format_type -> per-example formatter, chosen once per call rather than per example
+_EXAMPLE_FORMATTERS = {
+    'extraction': lambda i, ex: _EXTRACTION_TEMPLATE.format(
+        i=i,
+        name=ex.get('example_name', 'Training Example'),
+        category=ex.get('category', 'unknown'),
+        source=ex.get('source_text', '')[:2000],
+        extracted=_pretty_extracted(ex)
+    ),
+    'validation': lambda i, ex: _VALIDATION_TEMPLATE.format(
+        i=i,
+        category=ex.get('category', ''),
+        source=ex.get('source_text', '')[:500],
+        extracted=_pretty_extracted(ex)
+    ),
+    'financial': lambda i, ex: _FINANCIAL_TEMPLATE.format(
+        i=i,
+        source=ex.get('source_text', '')[:1000],
+        extracted=_pretty_extracted(ex)
+    ),
+}
+
+
+def format_examples_for_prompt(examples: List[Dict], format_type: str = 'extraction') -> str:
+    """
+    Format training examples for inclusion in prompts.
+    
+    Args:
+        examples: List of example dictionaries
+        format_type: Type of formatting ('extraction', 'validation', 'financial')
     
-    return "\n".join(formatted_parts)
+    Returns:
+        Formatted string to include in prompts
+    """
+    formatter = _EXAMPLE_FORMATTERS.get(format_type)
+    if not examples or formatter is None:
+        return ""
+    
+    return "\n".join(formatter(i, ex) for i, ex in enumerate(examples, 1))
 
 
 def get_resource_statement_examples(limit: int = 3) -> str:
     """Get formatted examples for resource statement extraction"""
-    examples = get_approved_examples(category='resource_statement', limit=limit)
-    examples.extend(get_approved_examples(category='reserve_statement', limit=limit))
+    examples = get_approved_examples_multi(['resource_statement', 'reserve_statement'], limit)
     return format_examples_for_prompt(examples[:limit], 'extraction')
 
 
@@ -131,6 +292,17 @@ def get_production_schedule_examples(limit: int = 3) -> str:
     return format_examples_for_prompt(examples, 'extraction')
 
 
+_RELEVANT_EXAMPLE_CATEGORIES = ('resource_statement', 'reserve_statement', 'financial_table',
+                                'production_schedule', 'cost_breakdown')
+
+_TRAINING_EXAMPLES_HEADER = """
+=== TRAINING EXAMPLES ===
+The following are verified examples of correct data extraction from mining technical documents.
+Use these as reference patterns for accurate extraction:
+
+"""
+
+
 def get_all_relevant_examples(commodity: str = None, limit_per_category: int = 2) -> str:
     """
     Get a diverse set of examples across all categories.
@@ -142,24 +314,13 @@ def get_all_relevant_examples(commodity: str = None, limit_per_category: int = 2
     Returns:
         Combined formatted examples string
     """
-    categories = ['resource_statement', 'reserve_statement', 'financial_table', 
-                  'production_schedule', 'cost_breakdown']
-    
-    all_examples = []
-    for cat in categories:
-        examples = get_approved_examples(category=cat, limit=limit_per_category)
-        all_examples.extend(examples)
+    all_examples = get_approved_examples_multi(_RELEVANT_EXAMPLE_CATEGORIES, limit_per_category)
     
     if not all_examples:
         return ""
     
-    header = """
-=== TRAINING EXAMPLES ===
-The following are verified examples of correct data extraction from mining technical documents.
-Use these as reference patterns for accurate extraction:
-
-"""
-    return header + format_examples_for_prompt(all_examples[:6], 'extraction')
+    # Only the examples that make it into the prompt are formatted
+    return _TRAINING_EXAMPLES_HEADER + format_examples_for_prompt(all_examples[:MAX_COMBINED_EXAMPLES], 'extraction')
 
 
 def build_enhanced_extraction_prompt(base_prompt: str, include_examples: bool = True) -> str:
@@ -177,6 +338,8 @@ def build_enhanced_extraction_prompt(base_prompt: str, include_examples: bool =
         return base_prompt
     
     examples_section = get_all_relevant_examples(limit_per_category=1)
+    # Cache hits only queue usage bumps; write them once the prompt's examples are known
+    flush_usage_counts()
     
     if not examples_section:
         return base_prompt
@@ -195,16 +358,14 @@ def get_training_stats() -> Dict:
     """Get statistics about available training data"""
     try:
         with get_db_session() as db:
-            from sqlalchemy import func
-            
-            total_examples = db.query(func.count(TrainingExample.id)).scalar() or 0
-            approved_examples = db.query(func.count(TrainingExample.id)).filter(
-                TrainingExample.is_approved == True
-            ).scalar() or 0
-            high_quality = db.query(func.count(TrainingExample.id)).filter(
-                TrainingExample.is_approved == True,
-                TrainingExample.quality_score >= MIN_QUALITY_SCORE
-            ).scalar() or 0
+            total_examples, approved_examples, high_quality = db.query(
+                func.count(TrainingExample.id),
+                func.sum(case((TrainingExample.is_approved == True, 1), else_=0)),
+                func.sum(case((and_(
+                    TrainingExample.is_approved == True,
+                    TrainingExample.quality_score >= MIN_QUALITY_SCORE
+                ), 1), else_=0))
+            ).one()
             
             categories = db.query(
                 TrainingExample.category,
@@ -212,9 +373,9 @@ def get_training_stats() -> Dict:
             ).filter(TrainingExample.is_approved == True).group_by(TrainingExample.category).all()
             
             return {
-                'total_examples': total_examples,
-                'approved_examples': approved_examples,
-                'high_quality_examples': high_quality,
+                'total_examples': total_examples or 0,
+                'approved_examples': approved_examples or 0,
+                'high_quality_examples': high_quality or 0,
                 'categories': {cat: count for cat, count in categories}
             }
     except Exception:
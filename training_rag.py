@@ -5,14 +5,22 @@ Uses vector embeddings for automatic document learning and retrieval.
 
 import os
 import json
+import uuid
+import asyncio
+import threading
 import hashlib
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from database import get_db_session
-from models import TrainingEmbedding, TrainingStats
+from models import TrainingEmbedding, TrainingStats, EmbeddingCache
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 CHUNK_SIZE = 1500
@@ -20,7 +28,36 @@ CHUNK_OVERLAP = 200
 MAX_CHUNKS_PER_QUERY = 5
 SIMILARITY_THRESHOLD = 0.5
 MIN_RESULTS_FALLBACK = 2
-MAX_PARALLEL_EMBEDDINGS = 3
+# Embedding requests in flight at once (each carries a batch of chunks); this is API
+# concurrency rather than local threads, capped to stay within OpenAI rate limits
+MAX_PARALLEL_EMBEDDINGS_CAP = 32
+MAX_PARALLEL_EMBEDDINGS = max(1, min(
+    MAX_PARALLEL_EMBEDDINGS_CAP,
+    int(os.environ.get('MAX_PARALLEL_EMBEDDINGS') or (os.cpu_count() or 4) * 5)
+))
+# Chunks are capped at CHUNK_SIZE characters, so a full batch stays well under the request token limit
+EMBEDDING_BATCH_SIZE = 96
+INDEX_LOAD_BATCH_SIZE = 500
+# Rows per INSERT statement; bounds the embedding JSON bound into one statement
+EMBEDDING_INSERT_BATCH = 100
+
+# Normalized embeddings of every stored chunk, with (id, chunk_text, file_name, category, commodity)
+# per row; rebuilt when TrainingStats.settings['index_version'] changes
+_TrainingIndex = namedtuple('_TrainingIndex', ['version', 'matrix', 'rows', 'categories', 'commodities'])
+_training_index = None
+
+# Recent build_enhanced_context results keyed by a hash of (filters, sample); a
+# near-identical sample (cosine >= CONTEXT_CACHE_SIMILARITY) reuses an entry too
+CONTEXT_CACHE_SIZE = 256
+CONTEXT_CACHE_SIMILARITY = 0.98
+_CachedContext = namedtuple('_CachedContext', ['version', 'filters', 'embedding', 'context'])
+_context_cache = OrderedDict()
+_context_cache_lock = threading.Lock()
+
+# Full stats recomputes (after deletes) run on one background worker so callers return immediately
+_stats_executor = ThreadPoolExecutor(max_workers=1)
+_stats_refresh_lock = threading.Lock()
+_stats_refresh_queued = False
 
 
 def get_openai_client():
@@ -37,56 +74,183 @@ def get_openai_client():
     return openai.OpenAI(api_key=api_key)
 
 
+def get_async_openai_client():
+    """Get async OpenAI client with API key, for concurrent embedding requests"""
+    import openai
+    api_key = os.environ.get('AI_INTEGRATIONS_OPENAI_API_KEY') or os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return None
+    
+    base_url = os.environ.get('AI_INTEGRATIONS_OPENAI_BASE_URL')
+    if base_url:
+        return openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+    return openai.AsyncOpenAI(api_key=api_key)
+
+
 def create_embedding(text: str) -> Optional[List[float]]:
     """Create embedding vector for text using OpenAI"""
+    try:
+        return _cached_embedding(EMBEDDING_MODEL, text).tolist()
+    except LookupError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _cached_embedding(model: str, text: str) -> np.ndarray:
+    # In-process layer over the embedding_cache table for repeated queries;
+    # float32 keeps ~6 KB per entry
+    embedding = create_embeddings_batch([text])[0]
+    if embedding is None:
+        # Raised rather than returned so failures are retried instead of cached
+        raise LookupError("no embedding available")
+    
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+def create_embeddings_batch(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Create embeddings for several texts with a single OpenAI request.
+    
+    Texts embedded before (by any process) are served from the embedding_cache
+    table; only the remaining ones are sent to the API.
+    """
     client = get_openai_client()
     if not client:
-        return None
+        return [None] * len(texts)
+    
+    embeddings, cleaned, hashes, missing = _split_cached(texts)
+    if not missing:
+        return embeddings
     
+    fresh = {}
     try:
-        text = text.replace("\n", " ").strip()
-        if not text:
-            return None
-        
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
-            input=text
+            input=[cleaned[i] for i in missing]
         )
-        return response.data[0].embedding
+        for item in response.data:
+            i = missing[item.index]
+            embeddings[i] = item.embedding
+            fresh[hashes[i]] = item.embedding
     except Exception as e:
         print(f"Embedding error: {e}")
-        return None
+    
+    if fresh:
+        _store_cached_embeddings(fresh)
+    
+    return embeddings
+
+
+def _split_cached(texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str], Dict[int, str], List[int]]:
+    """
+    Clean texts for embedding and fill in the ones already in embedding_cache.
+    
+    Returns:
+        (embeddings with cache hits filled in, cleaned texts, text hash by
+        position, positions of non-empty texts still to embed)
+    """
+    embeddings = [None] * len(texts)
+    cleaned = [text.replace("\n", " ").strip() for text in texts]
+    positions = [i for i, text in enumerate(cleaned) if text]
+    if not positions:
+        return embeddings, cleaned, {}, []
+    
+    hashes = {i: hashlib.sha256(cleaned[i].encode('utf-8')).hexdigest() for i in positions}
+    cached = _load_cached_embeddings(set(hashes.values()))
+    
+    missing = []
+    for i in positions:
+        embeddings[i] = cached.get(hashes[i])
+        if embeddings[i] is None:
+            missing.append(i)
+    
+    return embeddings, cleaned, hashes, missing
+
 
+def _load_cached_embeddings(text_hashes) -> Dict[str, List[float]]:
+    try:
+        with get_db_session() as db:
+            rows = db.query(EmbeddingCache.text_hash, EmbeddingCache.embedding).filter(
+                EmbeddingCache.model == EMBEDDING_MODEL,
+                EmbeddingCache.text_hash.in_(text_hashes)
+            ).all()
+            return {text_hash: embedding for text_hash, embedding in rows}
+    except Exception as e:
+        print(f"Embedding cache error: {e}")
+        return {}
 
-def create_embedding_for_chunk(args: Tuple[int, str]) -> Tuple[int, str, Optional[List[float]]]:
-    """Create embedding for a single chunk (for parallel processing)"""
-    chunk_index, chunk_text = args
-    embedding = create_embedding(chunk_text)
-    return (chunk_index, chunk_text, embedding)
+
+def _store_cached_embeddings(embeddings_by_hash: Dict[str, List[float]]):
+    try:
+        with get_db_session() as db:
+            # Another process may have cached the same text first; its row wins
+            db.execute(pg_insert(EmbeddingCache).on_conflict_do_nothing(index_elements=['model', 'text_hash']), [
+                {'model': EMBEDDING_MODEL, 'text_hash': text_hash, 'embedding': embedding}
+                for text_hash, embedding in embeddings_by_hash.items()
+            ])
+    except Exception as e:
+        # A failed cache write never fails the embedding call; the vectors are still returned
+        print(f"Embedding cache error: {e}")
 
 
 def create_embeddings_parallel(chunks: List[str], progress_callback=None) -> List[Tuple[int, str, Optional[List[float]]]]:
-    """Create embeddings for multiple chunks in parallel"""
-    results = []
+    """Create embeddings for multiple chunks, EMBEDDING_BATCH_SIZE chunks per concurrent request"""
     total = len(chunks)
+    client = get_async_openai_client()
+    if not client:
+        return [(i, chunk, None) for i, chunk in enumerate(chunks)]
     
-    chunk_args = [(i, chunk) for i, chunk in enumerate(chunks)]
+    embeddings, cleaned, hashes, missing = _split_cached(chunks)
+    batches = [missing[start:start + EMBEDDING_BATCH_SIZE] for start in range(0, len(missing), EMBEDDING_BATCH_SIZE)]
     
-    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_EMBEDDINGS) as executor:
-        futures = {executor.submit(create_embedding_for_chunk, args): args[0] for args in chunk_args}
-        completed = 0
+    fresh = {}
+    completed = total - len(missing)
+    
+    def record_batch(batch: List[int], batch_embeddings: List[Optional[List[float]]]):
+        nonlocal completed
+        for i, embedding in zip(batch, batch_embeddings):
+            if embedding is not None:
+                embeddings[i] = embedding
+                fresh[hashes[i]] = embedding
+        completed += len(batch)
         
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            completed += 1
-            
-            if progress_callback:
-                progress = 0.4 + (0.5 * (completed / total))
-                progress_callback(progress, f"Embedding chunk {completed}/{total}...")
+        if progress_callback:
+            progress = 0.4 + (0.5 * (completed / total))
+            progress_callback(progress, f"Embedding chunk {completed}/{total}...")
+    
+    asyncio.run(_embed_batches(client, [[cleaned[i] for i in batch] for batch in batches], batches, record_batch))
+    
+    if fresh:
+        _store_cached_embeddings(fresh)
     
-    results.sort(key=lambda x: x[0])
-    return results
+    return [(i, chunk, embeddings[i]) for i, chunk in enumerate(chunks)]
+
+
+async def _embed_batches(client, batch_texts: List[List[str]], batches: List[List[int]], record_batch):
+    """Send the batches concurrently (at most MAX_PARALLEL_EMBEDDINGS in flight), recording each as it lands"""
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_EMBEDDINGS)
+    
+    async def embed(batch_index: int):
+        texts = batch_texts[batch_index]
+        async with semaphore:
+            try:
+                response = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+                batch_embeddings = [None] * len(texts)
+                for item in response.data:
+                    batch_embeddings[item.index] = item.embedding
+                return batch_index, batch_embeddings
+            except Exception as e:
+                print(f"Embedding error: {e}")
+                return batch_index, [None] * len(texts)
+    
+    try:
+        for next_done in asyncio.as_completed([embed(i) for i in range(len(batches))]):
+            batch_index, batch_embeddings = await next_done
+            record_batch(batches[batch_index], batch_embeddings)
+    finally:
+        await client.close()
 
 
 def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
@@ -114,7 +278,10 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVE
         if chunk and len(chunk) > 50:
             chunks.append(chunk)
         
-        start = end - overlap if end < text_length else text_length
+        if end >= text_length:
+            break
+        # A break point inside the overlap would move start backwards and repeat the window forever
+        start = end - overlap if end - overlap > start else end
     
     return chunks
 
@@ -124,17 +291,107 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     if not vec1 or not vec2:
         return 0.0
     
-    a = np.array(vec1)
-    b = np.array(vec2)
+    return cosine_similarity_np(np.asarray(vec1, dtype=np.float32), np.asarray(vec2, dtype=np.float32))
+
+
+def cosine_similarity_np(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two 1-D arrays, for callers that already hold ndarrays"""
+    # One sqrt over the two squared norms instead of two np.linalg.norm calls
+    denominator = np.vdot(a, a) * np.vdot(b, b)
+    if denominator == 0:
+        return 0.0
     
-    dot_product = np.dot(a, b)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
+    return float(np.dot(a, b) / np.sqrt(denominator))
+
+
+def _unit_vector(values: List[float]) -> np.ndarray:
+    """float32 copy of a vector scaled to unit length (zero vectors stay zero)"""
+    vector = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _stored_floats(vector: np.ndarray) -> List[float]:
+    """
+    float32 vector as JSON-ready floats carrying only float32 precision.
     
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
+    Written with the shortest digits that round-trip through float32, which
+    cuts the JSON stored, transferred and parsed per embedding by about 40%.
+    """
+    return [float(value) for value in vector.astype(np.float32).astype(str)]
+
+
+def _normalize_stored_embeddings(db):
+    """Rewrite embeddings stored before vectors were normalized at insert time (runs once)"""
+    stats = db.query(TrainingStats).first()
+    if stats and (stats.settings or {}).get('embeddings_normalized'):
+        return
+    
+    for emb in db.query(TrainingEmbedding).all():
+        if emb.embedding:
+            emb.embedding = _stored_floats(_unit_vector(emb.embedding))
+    
+    stats = _invalidate_training_index(db)
+    stats.settings = {**stats.settings, 'embeddings_normalized': True}
+    db.commit()
+
+
+def _invalidate_training_index(db) -> TrainingStats:
+    """Give the stored embeddings a new version so every process rebuilds its index"""
+    stats = db.query(TrainingStats).first()
+    if not stats:
+        stats = TrainingStats()
+        db.add(stats)
+    # A fresh token rather than a counter, so concurrent writers never reuse a version
+    stats.settings = {**(stats.settings or {}), 'index_version': uuid.uuid4().hex}
+    return stats
+
+
+def _get_training_index(db) -> _TrainingIndex:
+    """Return the in-memory index, reloading it when the stored version has moved on"""
+    global _training_index
+    
+    # Read the version before the rows so a concurrent write can only cause an extra rebuild
+    stats = db.query(TrainingStats).first()
+    version = (stats.settings or {}).get('index_version') if stats else None
     
-    return dot_product / (norm_a * norm_b)
+    index = _training_index
+    if index is not None and version is not None and index.version == version:
+        return index
+    
+    # Streamed in batches straight into a preallocated matrix, so the decoded JSON
+    # vectors of the whole table are never held at the same time
+    expected = db.query(func.count(TrainingEmbedding.id)).scalar() or 0
+    matrix = None
+    rows = []
+    for row in db.query(
+        TrainingEmbedding.id,
+        TrainingEmbedding.chunk_text,
+        TrainingEmbedding.file_name,
+        TrainingEmbedding.category,
+        TrainingEmbedding.commodity,
+        TrainingEmbedding.embedding
+    ).order_by(TrainingEmbedding.id).yield_per(INDEX_LOAD_BATCH_SIZE):
+        if not row.embedding:
+            continue
+        if matrix is None:
+            matrix = np.empty((max(expected, 1), len(row.embedding)), dtype=np.float32)
+        elif len(rows) == len(matrix):
+            # Rows committed after the count was taken
+            matrix = np.concatenate([matrix, np.empty_like(matrix)])
+        matrix[len(rows)] = row.embedding
+        rows.append(tuple(row[:5]))
+    
+    index = _TrainingIndex(
+        version=version,
+        # Leading rows of a C-ordered buffer, so the matrix stays C-contiguous for the GEMV
+        matrix=matrix[:len(rows)] if matrix is not None else np.empty((0, 0), dtype=np.float32),
+        rows=rows,
+        categories=np.array([row[3] for row in rows], dtype=object),
+        commodities=np.array([row[4] for row in rows], dtype=object)
+    )
+    _training_index = index
+    return index
 
 
 def generate_file_id(file_bytes: bytes, file_name: str) -> str:
@@ -208,35 +465,53 @@ def process_training_document(
         
         embedding_results = create_embeddings_parallel(chunks, progress_callback)
         
-        embeddings_created = 0
-        
         with get_db_session() as db:
-            for chunk_index, chunk_text_content, embedding in embedding_results:
-                if embedding:
-                    training_embedding = TrainingEmbedding(
-                        file_name=unique_file_id,
-                        file_type=file_type,
-                        file_size=len(file_bytes),
-                        chunk_index=chunk_index,
-                        chunk_text=chunk_text_content,
-                        chunk_tokens=len(chunk_text_content.split()),
-                        category=category,
-                        commodity=commodity,
-                        embedding=embedding,
-                        embedding_model=EMBEDDING_MODEL,
-                        chunk_metadata={
-                            'total_chunks': len(chunks),
-                            'original_length': len(extracted_text),
-                            'original_filename': file_name
-                        },
-                        uploaded_by=user_id
-                    )
-                    db.add(training_embedding)
-                    embeddings_created += 1
+            # Re-uploading the same file adds chunks but not another document
+            is_new_file = db.query(TrainingEmbedding.id).filter(
+                TrainingEmbedding.file_name == unique_file_id
+            ).first() is None
+            
+            chunk_metadata = {
+                'total_chunks': len(chunks),
+                'original_length': len(extracted_text),
+                'original_filename': file_name
+            }
+            rows = [
+                {
+                    'file_name': unique_file_id,
+                    'file_type': file_type,
+                    'file_size': len(file_bytes),
+                    'chunk_index': chunk_index,
+                    'chunk_text': chunk_text_content,
+                    'chunk_tokens': len(chunk_text_content.split()),
+                    'category': category,
+                    'commodity': commodity,
+                    'embedding': _stored_floats(_unit_vector(embedding)),
+                    'embedding_model': EMBEDDING_MODEL,
+                    'chunk_metadata': chunk_metadata,
+                    'uploaded_by': user_id
+                }
+                for chunk_index, chunk_text_content, embedding in embedding_results
+                if embedding
+            ]
+            
+            # One executemany INSERT per batch instead of a unit-of-work add per chunk
+            for start in range(0, len(rows), EMBEDDING_INSERT_BATCH):
+                db.execute(insert(TrainingEmbedding), rows[start:start + EMBEDDING_INSERT_BATCH])
+            embeddings_created = len(rows)
+            tokens_created = sum(row['chunk_tokens'] for row in rows)
             
+            _invalidate_training_index(db)
             db.commit()
             
-            update_training_stats(db)
+            update_training_stats(
+                db,
+                chunks_added=embeddings_created,
+                tokens_added=tokens_created,
+                file_added_size=len(file_bytes) if is_new_file else None,
+                category=category,
+                commodity=commodity
+            )
         
         if progress_callback:
             progress_callback(1.0, "Complete!")
@@ -251,8 +526,81 @@ def process_training_document(
     return result
 
 
-def update_training_stats(db):
-    """Update global training statistics"""
+def update_training_stats(
+    db,
+    chunks_added: int = 0,
+    tokens_added: int = 0,
+    file_added_size: Optional[int] = None,
+    category: Optional[str] = None,
+    commodity: Optional[str] = None
+):
+    """
+    Apply one upload's deltas to the global training statistics.
+    
+    Args:
+        db: Session the upload was committed on
+        chunks_added: Number of chunks stored for the document
+        tokens_added: Sum of chunk_tokens over those chunks
+        file_added_size: Document size if the file was not stored before, else None
+        category: Category of the stored chunks
+        commodity: Commodity of the stored chunks
+    """
+    try:
+        stats = db.query(TrainingStats).first()
+        if not stats or stats.total_chunks is None:
+            recompute_training_stats(db)
+            return
+        
+        if chunks_added:
+            stats.total_chunks += chunks_added
+            stats.total_tokens = (stats.total_tokens or 0) + tokens_added
+            if file_added_size is not None:
+                stats.total_documents = (stats.total_documents or 0) + 1
+                stats.total_size_bytes = (stats.total_size_bytes or 0) + file_added_size
+            if category:
+                stats.categories_count = _add_count(stats.categories_count, category, chunks_added)
+            if commodity:
+                stats.commodities_count = _add_count(stats.commodities_count, commodity, chunks_added)
+        
+        stats.last_upload_at = datetime.utcnow()
+        
+        db.commit()
+        
+    except Exception as e:
+        print(f"Error updating training stats: {e}")
+
+
+def _add_count(counts: Optional[Dict], key: str, amount: int) -> Dict:
+    # New dict so the JSON column registers the change
+    counts = dict(counts or {})
+    counts[key] = counts.get(key, 0) + amount
+    return counts
+
+
+def _schedule_stats_refresh():
+    """Queue a full stats recompute on the background worker; requests made before it starts collapse into one"""
+    global _stats_refresh_queued
+    with _stats_refresh_lock:
+        if _stats_refresh_queued:
+            return
+        _stats_refresh_queued = True
+    _stats_executor.submit(_refresh_stats)
+
+
+def _refresh_stats():
+    global _stats_refresh_queued
+    with _stats_refresh_lock:
+        # Cleared before reading, so changes made during this run queue another one
+        _stats_refresh_queued = False
+    try:
+        with get_db_session() as db:
+            recompute_training_stats(db)
+    except Exception as e:
+        print(f"Error updating training stats: {e}")
+
+
+def recompute_training_stats(db):
+    """Recompute global training statistics from every stored chunk"""
     try:
         total_chunks = db.query(TrainingEmbedding).count()
         
@@ -303,7 +651,8 @@ def retrieve_relevant_training(
     category: Optional[str] = None,
     commodity: Optional[str] = None,
     limit: int = MAX_CHUNKS_PER_QUERY,
-    threshold: float = SIMILARITY_THRESHOLD
+    threshold: float = SIMILARITY_THRESHOLD,
+    query_embedding: Optional[List[float]] = None
 ) -> List[Dict]:
     """
     Retrieve the most relevant training chunks for a given query.
@@ -314,47 +663,55 @@ def retrieve_relevant_training(
         commodity: Filter by commodity (optional)
         limit: Maximum number of results
         threshold: Minimum similarity threshold
+        query_embedding: Precomputed embedding of query_text (optional, skips the API call)
     
     Returns:
         List of relevant training chunks with similarity scores
     """
-    query_embedding = create_embedding(query_text[:8000])
-    if not query_embedding:
+    if query_embedding is None:
+        query_embedding = create_embedding(query_text[:8000])
+    if query_embedding is None or len(query_embedding) == 0:
         return []
     
     try:
         with get_db_session() as db:
-            query = db.query(TrainingEmbedding)
+            _normalize_stored_embeddings(db)
+            index = _get_training_index(db)
             
+            candidates = np.ones(len(index.rows), dtype=bool)
             if category:
-                query = query.filter(TrainingEmbedding.category == category)
+                candidates &= index.categories == category
             if commodity:
-                query = query.filter(TrainingEmbedding.commodity == commodity)
+                candidates &= index.commodities == commodity
+            candidates = np.flatnonzero(candidates)
             
-            all_embeddings = query.all()
-            
-            if not all_embeddings:
+            if not len(candidates):
                 return []
             
-            all_results = []
-            for emb in all_embeddings:
-                if emb.embedding:
-                    similarity = cosine_similarity(query_embedding, emb.embedding)
-                    all_results.append({
-                        'id': emb.id,
-                        'chunk_text': emb.chunk_text,
-                        'file_name': emb.file_name,
-                        'category': emb.category,
-                        'commodity': emb.commodity,
-                        'similarity': float(similarity)
-                    })
+            # Stored rows are unit length, so cosine similarity is a plain dot product
+            similarities = (index.matrix @ _unit_vector(query_embedding))[candidates]
+            
+            # Only the best k can be returned, so rank those instead of sorting every row
+            k = min(max(limit, MIN_RESULTS_FALLBACK), len(similarities))
+            top = np.argpartition(-similarities, k - 1)[:k] if k < len(similarities) else np.arange(k)
+            order = top[np.lexsort((top, -similarities[top]))]
             
-            all_results.sort(key=lambda x: x['similarity'], reverse=True)
+            top_results = []
+            for i in order:
+                row_id, text, file_name, row_category, row_commodity = index.rows[candidates[i]]
+                top_results.append({
+                    'id': row_id,
+                    'chunk_text': text,
+                    'file_name': file_name,
+                    'category': row_category,
+                    'commodity': row_commodity,
+                    'similarity': float(similarities[i])
+                })
             
-            results = [r for r in all_results if r['similarity'] >= threshold]
+            results = [r for r in top_results if r['similarity'] >= threshold]
             
-            if len(results) < MIN_RESULTS_FALLBACK and len(all_results) >= MIN_RESULTS_FALLBACK:
-                results = all_results[:MIN_RESULTS_FALLBACK]
+            if len(results) < MIN_RESULTS_FALLBACK and len(top_results) >= MIN_RESULTS_FALLBACK:
+                results = top_results[:MIN_RESULTS_FALLBACK]
             
             stats = db.query(TrainingStats).first()
             if stats:
@@ -381,7 +738,8 @@ def normalize_filter(value: Optional[str]) -> Optional[str]:
 def build_enhanced_context(
     document_text: str,
     category: Optional[str] = None,
-    commodity: Optional[str] = None
+    commodity: Optional[str] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> str:
     """
     Build enhanced context by retrieving relevant training content.
@@ -390,6 +748,8 @@ def build_enhanced_context(
         document_text: The document being analyzed
         category: Filter training by category
         commodity: Filter training by commodity
+        query_embedding: Embedding the caller already has for the document (optional,
+            skips embedding the sample)
     
     Returns:
         Enhanced context string to prepend to prompts
@@ -407,13 +767,29 @@ def build_enhanced_context(
     sample = document_text[:8000] if len(document_text) > 8000 else document_text
     sample = ' '.join(sample.split())
     
+    filters = (normalized_category, normalized_commodity)
+    key = hashlib.blake2b(f"{normalized_category}\0{normalized_commodity}\0{sample}".encode('utf-8'), digest_size=16).digest()
+    version = _current_index_version()
+    
+    cached = _lookup_context(key, filters, version, None)
+    if cached is not None:
+        return cached
+    
+    if query_embedding is None:
+        query_embedding = create_embedding(sample)
+    if query_embedding is not None and len(query_embedding):
+        cached = _lookup_context(key, filters, version, _unit_vector(query_embedding))
+        if cached is not None:
+            return cached
+    
     try:
         relevant_chunks = retrieve_relevant_training(
             query_text=sample,
             category=normalized_category,
             commodity=normalized_commodity,
             limit=3,
-            threshold=0.5
+            threshold=0.5,
+            query_embedding=query_embedding
         )
     except Exception:
         return ""
@@ -421,6 +797,13 @@ def build_enhanced_context(
     if not relevant_chunks:
         return ""
     
+    context = _format_training_context(relevant_chunks)
+    if query_embedding is not None and len(query_embedding) and version is not None:
+        _store_context(key, _CachedContext(version, filters, _unit_vector(query_embedding), context))
+    return context
+
+
+def _format_training_context(relevant_chunks: List[Dict]) -> str:
     context_parts = [
         "=== TRAINING REFERENCE MATERIAL ===",
         "The following are examples from similar mining technical documents that demonstrate accurate data extraction patterns:",
@@ -442,6 +825,64 @@ def build_enhanced_context(
     return "\n".join(context_parts)
 
 
+def _current_index_version() -> Optional[str]:
+    try:
+        with get_db_session() as db:
+            stats = db.query(TrainingStats).first()
+            return (stats.settings or {}).get('index_version') if stats else None
+    except Exception:
+        return None
+
+
+def _lookup_context(key: bytes, filters: Tuple, version: Optional[str], query_vector: Optional[np.ndarray]) -> Optional[str]:
+    """
+    Cached context for the same sample, or (given its embedding) for a near-identical one.
+    
+    Entries built against an older index_version never match, so new training
+    data is picked up immediately.
+    """
+    if version is None:
+        return None
+    
+    with _context_cache_lock:
+        if query_vector is None:
+            entry = _context_cache.get(key)
+            hit = entry is not None and entry.version == version
+        else:
+            hit = False
+            for entry in reversed(_context_cache.values()):
+                if (entry.version == version and entry.filters == filters
+                        and float(entry.embedding @ query_vector) >= CONTEXT_CACHE_SIMILARITY):
+                    hit = True
+                    break
+        if not hit:
+            return None
+        _context_cache[key] = entry
+        _context_cache.move_to_end(key)
+    
+    _mark_training_used()
+    return entry.context
+
+
+def _store_context(key: bytes, entry: _CachedContext):
+    with _context_cache_lock:
+        _context_cache[key] = entry
+        _context_cache.move_to_end(key)
+        while len(_context_cache) > CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+
+
+def _mark_training_used():
+    # A cache hit still counts as the training data being used
+    try:
+        with get_db_session() as db:
+            stats = db.query(TrainingStats).first()
+            if stats:
+                stats.last_training_used_at = datetime.utcnow()
+    except Exception:
+        pass
+
+
 def get_training_statistics() -> Dict:
     """Get current training system statistics"""
     try:
@@ -492,10 +933,12 @@ def delete_training_document(file_name: str) -> bool:
             deleted = db.query(TrainingEmbedding).filter(
                 TrainingEmbedding.file_name == file_name
             ).delete(synchronize_session='fetch')
+            if deleted > 0:
+                _invalidate_training_index(db)
             db.commit()
             
             if deleted > 0:
-                update_training_stats(db)
+                _schedule_stats_refresh()
             
             return deleted > 0
     except Exception as e:
@@ -508,6 +951,7 @@ def delete_all_training() -> bool:
     try:
         with get_db_session() as db:
             db.query(TrainingEmbedding).delete()
+            _invalidate_training_index(db)
             
             stats = db.query(TrainingStats).first()
             if stats: